@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Template Asset Builder
+Pre-renders the storyboard border and composition guides to assets/ so
+gimp_image_gen can load them instead of drawing them at runtime
+"""
+import argparse
+import os
+
+from PIL import Image, ImageDraw
+
+from gimp_image_gen import ASSET_DIR, _draw_guides
+
+
+def build_template(width=1920, height=1080):
+    """
+    Render the guides for one canvas size and save them as an asset.
+
+    Args:
+        width (int): Canvas width in pixels
+        height (int): Canvas height in pixels
+
+    Returns:
+        str: Path to the saved asset
+    """
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    output_file = os.path.join(ASSET_DIR, f"template_{width}x{height}.png")
+
+    image = Image.new('L', (width, height), color=255)
+    _draw_guides(ImageDraw.Draw(image), width, height)
+    image.save(output_file, 'PNG', optimize=True)
+
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render storyboard template assets.")
+    parser.add_argument("--width", type=int, default=1920, help="Canvas width (default: 1920)")
+    parser.add_argument("--height", type=int, default=1080, help="Canvas height (default: 1080)")
+    args = parser.parse_args()
+
+    output_file = build_template(args.width, args.height)
+    print(f"✓ Template saved: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,169 +1,566 @@
 from PIL import Image, ImageDraw, ImageFont
+from PIL.PngImagePlugin import PngInfo
 import argparse
+import functools
+import logging
 import os
 import requests
+import shutil
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 from urllib.parse import quote
+from urllib3.util.retry import Retry
 
-def generate_image(prompt, output_file, use_gimp=False):
+# Optional SIMD PNG encoder, enabled with PIL_FAST_PNG=1
+try:
+    import numpy as np
+    import pyspng
+    PYSPNG_AVAILABLE = True
+except ImportError:
+    PYSPNG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+FONT_PATH = "/System/Library/Fonts/Helvetica.ttc"
+
+# The Hugging Face Inference API rejects or queues anonymous requests, so it
+# is only tried when a token is configured
+HF_TOKEN = os.environ.get("HF_TOKEN")
+
+# PNG text chunk marking a PIL sketch saved in place of an AI image
+FALLBACK_KEY = "GimpMCP-Fallback"
+
+
+def _create_session():
+    """Create an HTTP session that pools and keeps alive API connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=16,
+        # Retry failed connects only. A read timeout is raised as is rather
+        # than re-sent, which would triple the wait before the PIL fallback
+        max_retries=Retry(total=2, connect=2, read=False, backoff_factor=0.3)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# Shared across all calls so repeated prompts reuse TCP/TLS connections
+_SESSION = _create_session()
+
+# Output directories already created by this process
+_CREATED_DIRS = set()
+
+
+def _ensure_dir(path):
+    """Create path (if any) the first time it is seen, skipping repeat makedirs calls"""
+    if path and path not in _CREATED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _CREATED_DIRS.add(path)
+
+
+@functools.lru_cache(maxsize=8)
+def _get_fonts(title_size, text_size):
     """
-    Generates a storyboard image using PIL/Pillow.
+    Load the title and body fonts once per process.
+
+    The basic layout engine is used instead of Raqm: storyboard text is plain
+    Latin, so HarfBuzz shaping is unnecessary per-character work.
 
     Args:
-        prompt (str): The text description for the image.
-        output_file (str): The path to save the generated PNG.
-        use_gimp (bool): Whether to enable GIMP post-processing (default: False).
+        title_size (int): Point size of the title font.
+        text_size (int): Point size of the body text font.
+
+    Returns:
+        tuple: (title_font, text_font)
     """
-    # Create output directory if it doesn't exist
-    output_dir = os.path.dirname(output_file)
-    if output_dir:  # Only create directory if path contains a directory
-        os.makedirs(output_dir, exist_ok=True)
-    
-    # Create a new image with white background
-    width, height = 1920, 1080
-    image = Image.new('RGB', (width, height), color='white')
-    draw = ImageDraw.Draw(image)
-    
-    # Draw a simple border
-    border_color = '#333333'
-    draw.rectangle([(10, 10), (width-10, height-10)], outline=border_color, width=3)
-    
-    # Add title text
     try:
         # Try to use a nicer font if available
-        title_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 60)
-        text_font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", 36)
-    except:
+        title_font = ImageFont.truetype(FONT_PATH, title_size,
+                                        layout_engine=ImageFont.Layout.BASIC)
+        text_font = ImageFont.truetype(FONT_PATH, text_size,
+                                       layout_engine=ImageFont.Layout.BASIC)
+    except OSError:
         # Fallback to default font
         title_font = ImageFont.load_default()
         text_font = ImageFont.load_default()
+    return title_font, text_font
+
+# Fixed header and footer text, drawn once into the cached template
+TITLE_TEXT = "STORYBOARD DRAFT"
+NOTE_TEXT = "Generated Draft • Refine in GIMP or other image editor"
+
+# Pre-rendered border and composition guides (see build_template.py)
+ASSET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+
+def _draw_guides(draw, width, height):
+    """
+    Draw the border and composition guides shared by every storyboard panel.
+
+    Args:
+        draw (ImageDraw.ImageDraw): Drawing context of an 'L' mode canvas.
+        width (int): Canvas width in pixels.
+        height (int): Canvas height in pixels.
+    """
+    # Draw a simple border
+    border_color = 0x33
+    draw.rectangle([(10, 10), (width-10, height-10)], outline=border_color, width=3)
     
-    # Draw title
-    title = "STORYBOARD DRAFT"
-    title_bbox = draw.textbbox((0, 0), title, font=title_font)
-    title_width = title_bbox[2] - title_bbox[0]
-    draw.text(((width - title_width) / 2, 40), title, fill='black', font=title_font)
+    # Draw placeholder sketch indicators
+    sketch_color = 0xCC
+    center_x, center_y = width // 2, height // 2
+    
+    # Draw simple composition guides
+    draw.ellipse([(center_x - 200, center_y - 150), (center_x + 200, center_y + 150)], 
+                 outline=sketch_color, width=2)
+    draw.line([(center_x - 250, center_y), (center_x + 250, center_y)], 
+              fill=sketch_color, width=1)
+    draw.line([(center_x, center_y - 200), (center_x, center_y + 200)], 
+              fill=sketch_color, width=1)
+
+def _load_guides(width, height):
+    """
+    Load the pre-rendered guides for this canvas size, or draw them if no asset exists.
+
+    Returns:
+        PIL.Image.Image: An 'L' mode canvas with the border and guides.
+    """
+    asset_path = os.path.join(ASSET_DIR, f"template_{width}x{height}.png")
+    if os.path.exists(asset_path):
+        with Image.open(asset_path) as asset:
+            if asset.mode == 'L' and asset.size == (width, height):
+                asset.load()
+                return asset.copy()
     
-    # Draw prompt text (word-wrapped)
-    margin = 100
-    max_width = width - 2 * margin
-    y_offset = 150
+    # Create a new grayscale image with white background
+    image = Image.new('L', (width, height), color=255)
+    _draw_guides(ImageDraw.Draw(image), width, height)
+    return image
+
+@functools.lru_cache(maxsize=4)
+def _get_template(width, height):
+    """
+    Build the static storyboard background once per canvas size.
+
+    The border, composition guides, title and bottom note are identical for
+    every prompt, so they are rasterized a single time and callers copy the
+    result before drawing the prompt text on top. Everything on the canvas is
+    grayscale, so it is kept in 8-bit 'L' mode (a third of the RGB size).
+    The geometry comes from a shipped asset when one matches the size; the
+    text is drawn here because it depends on the fonts installed locally.
+
+    Args:
+        width (int): Canvas width in pixels.
+        height (int): Canvas height in pixels.
+
+    Returns:
+        PIL.Image.Image: The template image (do not draw on it directly).
+    """
+    title_font, text_font = _get_fonts(60, 36)
+
+    image = _load_guides(width, height)
+    draw = ImageDraw.Draw(image)
+    
+    # Draw title
+    title_width = title_font.getlength(TITLE_TEXT)
+    draw.text(((width - title_width) / 2, 40), TITLE_TEXT, fill=0, font=title_font)
     
-    words = prompt.split()
+    # Add a note at the bottom
+    note_width = text_font.getlength(NOTE_TEXT)
+    draw.text(((width - note_width) / 2, height - 60), NOTE_TEXT, fill=0x99, font=text_font)
+
+    return image
+
+# Layout of the prompt text block on the storyboard canvas
+TEXT_MARGIN = 100
+TEXT_TOP = 150
+LINE_HEIGHT = 50
+
+
+def _wrap_text(text, font, max_width):
+    """
+    Word-wrap text so that each line fits within max_width pixels.
+
+    Each word is measured once and a running line width is kept, instead of
+    re-laying-out the whole candidate line for every word.
+
+    Args:
+        text (str): The text to wrap.
+        font (ImageFont.FreeTypeFont): The font used to measure words.
+        max_width (float): Maximum line width in pixels.
+
+    Returns:
+        list: The wrapped lines.
+    """
+    space_width = font.getlength(' ')
     lines = []
     current_line = []
+    current_width = 0
     
-    for word in words:
-        test_line = ' '.join(current_line + [word])
-        bbox = draw.textbbox((0, 0), test_line, font=text_font)
-        if bbox[2] - bbox[0] <= max_width:
+    for word in text.split():
+        word_width = font.getlength(word)
+        if not current_line:
+            current_line = [word]
+            current_width = word_width
+        elif current_width + space_width + word_width <= max_width:
             current_line.append(word)
+            current_width += space_width + word_width
         else:
-            if current_line:
-                lines.append(' '.join(current_line))
+            lines.append(' '.join(current_line))
             current_line = [word]
+            current_width = word_width
     
     if current_line:
         lines.append(' '.join(current_line))
     
+    return lines
+
+def _render_panel(lines, width, height):
+    """Copy the cached background and draw pre-wrapped prompt lines on it"""
+    image = _get_template(width, height).copy()
+    draw = ImageDraw.Draw(image)
+    _, text_font = _get_fonts(60, 36)
+    
+    y_offset = TEXT_TOP
     for line in lines:
-        draw.text((margin, y_offset), line, fill='#333333', font=text_font)
-        y_offset += 50
+        draw.text((TEXT_MARGIN, y_offset), line, fill=0x33, font=text_font)
+        y_offset += LINE_HEIGHT
     
-    # Draw placeholder sketch indicators
-    sketch_color = '#CCCCCC'
-    center_x, center_y = width // 2, height // 2
+    return image
+
+def _save_png_fast(image, output_file, pnginfo=None):
+    """
+    Save a draft PNG, favoring encode speed over file size.
+
+    Uses pyspng when it is installed and PIL_FAST_PNG is set (and no text
+    chunks are needed), otherwise Pillow with light zlib compression and no
+    extra filter-selection pass.
+    """
+    if PYSPNG_AVAILABLE and os.environ.get("PIL_FAST_PNG") and pnginfo is None:
+        data = pyspng.encode(np.asarray(image), compress_level=1)
+        with open(output_file, "wb") as f:
+            f.write(data)
+    else:
+        image.save(output_file, 'PNG', compress_level=1, optimize=False, pnginfo=pnginfo)
+
+def _save_panel(image, output_file, fast, pnginfo=None):
+    """Save a rendered panel (PNG stores 'L' natively as 8-bit grayscale)"""
+    if fast:
+        _save_png_fast(image, output_file, pnginfo)
+    else:
+        image.save(output_file, 'PNG', pnginfo=pnginfo)
+
+def _output_exists(output_file):
+    """Whether output_file already holds a non-empty image from a previous run"""
+    return os.path.exists(output_file) and os.path.getsize(output_file) > 0
+
+def _is_fallback(output_file):
+    """Whether output_file is a PIL sketch standing in for an AI image (or unreadable)"""
+    try:
+        # Text chunks ahead of the pixel data are parsed by open() alone
+        with Image.open(output_file) as image:
+            return FALLBACK_KEY in image.info
+    except OSError:
+        return True
+
+def _render_prompt(prompt, output_file, fast, pnginfo=None):
+    """Lay out, draw and save a single 1920x1080 storyboard panel"""
+    width, height = 1920, 1080
+    _, text_font = _get_fonts(60, 36)
+    lines = _wrap_text(prompt, text_font, width - 2 * TEXT_MARGIN)
     
-    # Draw simple composition guides
-    draw.ellipse([(center_x - 200, center_y - 150), (center_x + 200, center_y + 150)], 
-                 outline=sketch_color, width=2)
-    draw.line([(center_x - 250, center_y), (center_x + 250, center_y)], 
-              fill=sketch_color, width=1)
-    draw.line([(center_x, center_y - 200), (center_x, center_y + 200)], 
-              fill=sketch_color, width=1)
+    # Draw prompt text (word-wrapped) over a copy of the cached background
+    image = _render_panel(lines, width, height)
+    _save_panel(image, output_file, fast, pnginfo)
+
+def generate_image(prompt, output_file, use_gimp=False, fast=False, quiet=False,
+                   skip_existing=False):
+    """
+    Generates a storyboard image using PIL/Pillow.
+
+    Text is laid out with Pillow's basic layout engine, so right-to-left and
+    complex scripts (e.g. Arabic, Devanagari) are not shaped correctly.
+
+    Args:
+        prompt (str): The text description for the image.
+        output_file (str): The path to save the generated PNG.
+        use_gimp (bool): Whether to enable GIMP post-processing (default: False).
+        fast (bool): Favor encode speed over file size when saving (default: False).
+        quiet (bool): Log progress at debug level, e.g. inside batch runs (default: False).
+        skip_existing (bool): Keep an existing non-empty output_file instead of
+            regenerating it (default: False).
+    """
+    log = logger.debug if quiet else logger.info
     
-    # Add a note at the bottom
-    note = "Generated Draft • Refine in GIMP or other image editor"
-    note_bbox = draw.textbbox((0, 0), note, font=text_font)
-    note_width = note_bbox[2] - note_bbox[0]
-    draw.text(((width - note_width) / 2, height - 60), note, fill='#999999', font=text_font)
+    if skip_existing and _output_exists(output_file):
+        log(f"✓ Using existing image: {output_file}")
+        return
     
-    # Save the image
-    image.save(output_file, 'PNG')
-    print(f"✓ Image saved: {output_file}")
+    # Create output directory if it doesn't exist
+    _ensure_dir(os.path.dirname(output_file))
+    
+    _render_prompt(prompt, output_file, fast)
+    log(f"✓ Image saved: {output_file}")
 
     # GIMP integration disabled due to hanging issues
     if use_gimp:
-        print("Note: GIMP post-processing is disabled. Use GIMP manually to refine the image.")
+        log("Note: GIMP post-processing is disabled. Use GIMP manually to refine the image.")
+
+def render_panels(prompts, output_files, width=1920, height=1080, fast=True,
+                  skip_existing=False):
+    """
+    Renders several storyboard panels that share one canvas size and font set.
+
+    All prompts are laid out up front, then each panel is just a template
+    copy, the prompt text and a save, so the fixed setup is paid once. A panel
+    that fails is recorded and the rest are still rendered.
+
+    Args:
+        prompts (list): The text descriptions, one per panel.
+        output_files (list): The paths to save each panel PNG.
+        width (int): Canvas width in pixels (default: 1920).
+        height (int): Canvas height in pixels (default: 1080).
+        fast (bool): Favor encode speed over file size when saving (default: True).
+        skip_existing (bool): Leave panels whose output file already exists (default: False).
+
+    Returns:
+        list: One error message per prompt, in the same order, or None for
+            panels that were rendered (or skipped).
+    """
+    if len(prompts) != len(output_files):
+        raise ValueError("prompts and output_files must have the same length")
+
+    errors = [None] * len(prompts)
+    _, text_font = _get_fonts(60, 36)
+    max_width = width - 2 * TEXT_MARGIN
+
+    layouts = []
+    for i, (prompt, output_file) in enumerate(zip(prompts, output_files)):
+        if skip_existing and _output_exists(output_file):
+            continue
+        try:
+            layouts.append((i, _wrap_text(prompt, text_font, max_width), output_file))
+        except Exception as e:
+            errors[i] = str(e)
+
+    for i, lines, output_file in layouts:
+        try:
+            _ensure_dir(os.path.dirname(output_file))
+            image = _render_panel(lines, width, height)
+            _save_panel(image, output_file, fast)
+        except Exception as e:
+            errors[i] = str(e)
+
+    return errors
+
+def _save_response(response, output_file):
+    """
+    Stream an HTTP response body to disk without buffering it in memory.
+
+    Args:
+        response (requests.Response): A response opened with stream=True.
+        output_file (str): The path to write the body to.
+    """
+    # Let urllib3 undo any gzip/deflate transfer encoding while streaming
+    response.raw.decode_content = True
+    with open(output_file, "wb") as f:
+        shutil.copyfileobj(response.raw, f, length=1 << 16)
+
+def _try_api(api, prompt, output_file, log):
+    """
+    Request one image from a single Stable Diffusion API.
+
+    Args:
+        api (dict): API entry with name, url and method.
+        prompt (str): The text description for the image.
+        output_file (str): The path to write the image to.
+        log (callable): Logger method for progress messages.
+
+    Returns:
+        bool: True if the image was written to output_file.
+    """
+    try:
+        log(f"Trying {api['name']}...")
+        
+        if api['method'] == 'huggingface':
+            headers = {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {HF_TOKEN}"
+            }
+            payload = {"inputs": prompt}
+            # Short connect timeout; a 503/504 (model loading) fails fast
+            # and leaves the other API to answer
+            with _SESSION.post(api['url'], headers=headers, json=payload,
+                               timeout=(3, 30), stream=True) as response:
+                if response.status_code == 200:
+                    _save_response(response, output_file)
+                    return True
+                logger.warning(f"  {api['name']} returned status {response.status_code}")
+                
+        elif api['method'] == 'pollinations':
+            # Pollinations.ai - Free, no API key required
+            url = api['url'].format(quote(prompt))
+            with _SESSION.get(url, timeout=60, stream=True) as response:
+                if response.status_code == 200:
+                    _save_response(response, output_file)
+                    return True
+                logger.warning(f"  {api['name']} returned status {response.status_code}")
+                
+    except requests.exceptions.Timeout:
+        logger.warning(f"  {api['name']} timed out")
+    except Exception as e:
+        logger.warning(f"  {api['name']} error: {str(e)}")
+    
+    return False
+
+def _discard(path):
+    """Remove a partial download if it exists"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
 
-def generate_image_with_ai(prompt, output_file):
+def _race_apis(apis, prompt, output_file, log):
+    """
+    Query several APIs at once and keep the first image that arrives.
+
+    Each API downloads to its own temporary file; the winner is moved into
+    place and the others are discarded whenever they finish.
+
+    Returns:
+        bool: True if any API produced output_file.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(apis))
+    futures = {}
+    for api in apis:
+        part_file = f"{output_file}.{api['method']}.part"
+        futures[executor.submit(_try_api, api, prompt, part_file, log)] = part_file
+    
+    winner = None
+    try:
+        pending = set(futures)
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if winner is None and future.result():
+                    winner = future
+        
+        if winner is not None:
+            os.replace(futures[winner], output_file)
+    finally:
+        # Losers can't be interrupted mid-request; clean up after them instead
+        for future, part_file in futures.items():
+            if future is not winner:
+                future.add_done_callback(lambda _, p=part_file: _discard(p))
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return winner is not None
+
+def generate_image_with_ai(prompt, output_file, fast=False, quiet=False, skip_existing=False):
     """
     Generates an image using Stable Diffusion based on the text description.
 
+    When more than one API is configured they are queried concurrently and
+    the first successful response wins, so latency is that of the fastest
+    API rather than the sum of every timeout.
+
     Args:
         prompt (str): The text description for the image.
         output_file (str): The path to save the generated PNG.
+        fast (bool): Use fast PNG encoding for the PIL fallback (default: False).
+        quiet (bool): Log progress at debug level, e.g. inside batch runs (default: False).
+        skip_existing (bool): Keep an existing non-empty output_file instead of
+            requesting it again, unless it is a PIL fallback (default: False).
     """
+    log = logger.debug if quiet else logger.info
+    
+    # A fallback sketch only stands in until the AI answers, so it is retried
+    if skip_existing and _output_exists(output_file) and not _is_fallback(output_file):
+        log(f"✓ Using existing image: {output_file}")
+        return
+    
     # Create output directory if it doesn't exist
-    output_dir = os.path.dirname(output_file)
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
+    _ensure_dir(os.path.dirname(output_file))
     
-    print(f"Generating image with Stable Diffusion...")
-    print(f"Prompt: {prompt}")
+    log("Generating image with Stable Diffusion...")
+    log(f"Prompt: {prompt}")
     
     # Try multiple Stable Diffusion API endpoints
-    apis = [
-        {
+    apis = []
+    if HF_TOKEN:
+        apis.append({
             "name": "Hugging Face Inference API",
             "url": "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-2-1",
             "method": "huggingface"
-        },
-        {
-            "name": "Pollinations.ai",
-            "url": "https://image.pollinations.ai/prompt/{}",
-            "method": "pollinations"
-        }
-    ]
+        })
+    apis.append({
+        "name": "Pollinations.ai",
+        "url": "https://image.pollinations.ai/prompt/{}",
+        "method": "pollinations"
+    })
     
-    for api in apis:
-        try:
-            print(f"Trying {api['name']}...")
-            
-            if api['method'] == 'huggingface':
-                headers = {"Content-Type": "application/json"}
-                # Note: Add your Hugging Face token if needed: headers["Authorization"] = "Bearer YOUR_TOKEN"
-                payload = {"inputs": prompt}
-                response = requests.post(api['url'], headers=headers, json=payload, timeout=60)
-                
-                if response.status_code == 200:
-                    with open(output_file, "wb") as f:
-                        f.write(response.content)
-                    print(f"✓ AI-generated image saved: {output_file}")
-                    return
-                else:
-                    print(f"  {api['name']} returned status {response.status_code}")
-                    
-            elif api['method'] == 'pollinations':
-                # Pollinations.ai - Free, no API key required
-                url = api['url'].format(quote(prompt))
-                response = requests.get(url, timeout=60)
-                
-                if response.status_code == 200:
-                    with open(output_file, "wb") as f:
-                        f.write(response.content)
-                    print(f"✓ AI-generated image saved: {output_file}")
-                    return
-                else:
-                    print(f"  {api['name']} returned status {response.status_code}")
-                    
-        except requests.exceptions.Timeout:
-            print(f"  {api['name']} timed out")
-        except Exception as e:
-            print(f"  {api['name']} error: {str(e)}")
+    if len(apis) == 1:
+        # Download beside the output and move it into place only once it is
+        # complete, so an interrupted transfer never passes for a finished image
+        part_file = f"{output_file}.part"
+        success = _try_api(apis[0], prompt, part_file, log)
+        if success:
+            os.replace(part_file, output_file)
+        else:
+            _discard(part_file)
+    else:
+        success = _race_apis(apis, prompt, output_file, log)
+    
+    if success:
+        log(f"✓ AI-generated image saved: {output_file}")
+        return
     
     # Fallback to PIL-based generation if all APIs fail
-    print("\n⚠ All AI APIs failed. Falling back to PIL-based generation...")
-    generate_image(prompt, output_file, use_gimp=False)
+    logger.warning("\n⚠ All AI APIs failed. Falling back to PIL-based generation...")
+    # The sketch is tagged inside the PNG itself rather than with a sidecar file
+    pnginfo = PngInfo()
+    pnginfo.add_text(FALLBACK_KEY, "1")
+    _render_prompt(prompt, output_file, fast, pnginfo)
+    log(f"✓ Image saved: {output_file}")
+
+def generate_images_with_ai(prompts, output_files, max_workers=8, fast=True, quiet=True,
+                            skip_existing=False):
+    """
+    Generates several images with Stable Diffusion, overlapping the requests.
+
+    Each prompt still goes through generate_image_with_ai (including its API
+    fallbacks), but the requests run concurrently in a thread pool since the
+    time is spent waiting on the remote APIs rather than on local CPU.
+
+    Args:
+        prompts (list): The text descriptions, one per image.
+        output_files (list): The paths to save each generated PNG.
+        max_workers (int): Maximum number of concurrent requests (default: 8).
+        fast (bool): Use fast PNG encoding for the PIL fallback (default: True).
+        quiet (bool): Log per-image progress at debug level (default: True).
+        skip_existing (bool): Skip prompts whose output file already exists. The
+            prompt is not checked, so only enable this when the prompts are
+            unchanged since the previous run (default: False).
+
+    Returns:
+        list: The output file paths, in the same order as the prompts.
+    """
+    if len(prompts) != len(output_files):
+        raise ValueError("prompts and output_files must have the same length")
+
+    if not prompts:
+        return []
+
+    workers = max(1, min(max_workers, len(prompts)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(functools.partial(generate_image_with_ai, fast=fast, quiet=quiet,
+                                            skip_existing=skip_existing),
+                          prompts, output_files))
+
+    return list(output_files)
 
 def main():
     parser = argparse.ArgumentParser(description="Generate storyboard images with AI or PIL.")
@@ -172,12 +569,14 @@ def main():
     parser.add_argument("--use-ai", action="store_true", help="Use Stable Diffusion AI for image generation.")
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+
     if args.use_ai:
         generate_image_with_ai(args.prompt, args.output_file)
     else:
         generate_image(args.prompt, args.output_file, use_gimp=False)
     
-    print(f"\nImage generated successfully: {args.output_file}")
+    logger.info(f"\nImage generated successfully: {args.output_file}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
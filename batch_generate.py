@@ -3,41 +3,119 @@
 Batch Storyboard Generator
 Generates multiple storyboard panels from a list of prompts
 """
+import logging
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 # Add MCP directory to path
 sys.path.insert(0, str(Path(__file__).parent / "MCP" / "gimp-image-gen"))
-from gimp_image_gen import generate_image
+from gimp_image_gen import generate_images_with_ai, render_panels, _get_template
 
-def generate_batch_storyboards(prompts, output_dir="storyboards"):
+# Optional progress bar
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+logger = logging.getLogger(__name__)
+
+def _warm_worker():
+    """Load fonts and the background template once per worker process"""
+    _get_template(1920, 1080)
+
+def _render_chunk(args):
+    """
+    Render a group of storyboard panels (runs inside a worker process).
+    
+    Args:
+        args (tuple): (panels, fast, skip_existing) where panels is a list of
+            (idx, prompt, output_file) tuples
+        
+    Returns:
+        list: (idx, prompt, output_file, error) for each panel, with error
+            None when the panel was rendered
+    """
+    panels, fast, skip_existing = args
+    errors = render_panels([prompt for _, prompt, _ in panels],
+                           [output_file for _, _, output_file in panels],
+                           fast=fast, skip_existing=skip_existing)
+    return [panel + (error,) for panel, error in zip(panels, errors)]
+
+def generate_batch_storyboards(prompts, output_dir="storyboards", max_workers=None, use_ai=False,
+                               fast=True, skip_existing=False):
     """
     Generate multiple storyboard images from a list of prompts.
     
+    Panels are split across worker processes, since rasterizing and
+    PNG-encoding each panel is CPU-bound; each worker lays out and renders its
+    share through render_panels. With use_ai the prompts are sent to the
+    Stable Diffusion APIs concurrently instead.
+    
     Args:
         prompts (list): List of prompt strings
         output_dir (str): Directory to save output images
+        max_workers (int): Number of worker processes (default: os.cpu_count())
+        use_ai (bool): Whether to use AI generation for the panels
+        fast (bool): Favor PNG encode speed over file size (default: True)
+        skip_existing (bool): Keep panels that already exist from a previous run;
+            the prompt is not checked, so only enable this when the prompts
+            are unchanged (default: False)
     """
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
-    print(f"🎨 Generating {len(prompts)} storyboard panels...")
-    print(f"📁 Output directory: {output_dir}\n")
+    logger.info(f"🎨 Generating {len(prompts)} storyboard panels...")
+    logger.info(f"📁 Output directory: {output_dir}\n")
+    
+    panels = [(idx, prompt, os.path.join(output_dir, f"panel_{idx:03d}.png"))
+              for idx, prompt in enumerate(prompts, start=1)]
+    
+    if use_ai:
+        generate_images_with_ai([prompt for _, prompt, _ in panels],
+                                [output_file for _, _, output_file in panels],
+                                fast=fast, skip_existing=skip_existing)
+        logger.info(f"🎉 Batch generation complete! {len(prompts)} panels created in '{output_dir}'")
+        return
+    
+    # One chunk per worker so the per-chunk setup is paid once per process
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(panels)))
+    chunks = [(panels[i::workers], fast, skip_existing) for i in range(workers)]
     
-    for idx, prompt in enumerate(prompts, start=1):
-        output_file = os.path.join(output_dir, f"panel_{idx:03d}.png")
+    # Repaint a single progress line when tqdm is installed, otherwise log each panel
+    progress = tqdm(total=len(panels), unit="panel") if tqdm else None
+    log = logger.debug if progress else logger.info
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as executor:
+        futures = {executor.submit(_render_chunk, chunk): chunk for chunk in chunks}
         
-        print(f"[{idx}/{len(prompts)}] Generating: {prompt[:60]}...")
-        try:
-            generate_image(prompt, output_file, use_gimp=False)
-            print(f"    ✓ Saved: {output_file}\n")
-        except Exception as e:
-            print(f"    ✗ Error: {e}\n")
-    
-    print(f"🎉 Batch generation complete! {len(prompts)} panels created in '{output_dir}'")
+        for future in as_completed(futures):
+            chunk_panels = futures[future][0]
+            try:
+                for idx, prompt, output_file, error in future.result():
+                    if error is None:
+                        log(f"[{idx}/{len(prompts)}] Generated: {prompt[:60]}...")
+                        log(f"    ✓ Saved: {output_file}\n")
+                    else:
+                        logger.error(f"[{idx}/{len(prompts)}] {prompt[:60]}...")
+                        logger.error(f"    ✗ Error: {error}\n")
+            except Exception as e:
+                # The worker itself died, so none of its results came back
+                for idx, prompt, _ in chunk_panels:
+                    logger.error(f"[{idx}/{len(prompts)}] {prompt[:60]}...")
+                    logger.error(f"    ✗ Error: {e}\n")
+            if progress:
+                progress.update(len(chunk_panels))
+    
+    if progress:
+        progress.close()
+    
+    logger.info(f"🎉 Batch generation complete! {len(prompts)} panels created in '{output_dir}'")
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     # Example: Generate storyboard panels for "El Manjar de los Dioses" trailer
     example_prompts = [
         "Panel 1: Young Carlos in Hatillo, Puerto Rico, holding his first guitar, humble neighborhood in background",
@@ -57,5 +135,5 @@ if __name__ == "__main__":
     
     generate_batch_storyboards(example_prompts, output_dir)
     
-    print("\n💡 Tip: Edit this script to add your own prompts!")
-    print(f"   Generated images are ready for refinement in GIMP or other editors.")
+    logger.info("\n💡 Tip: Edit this script to add your own prompts!")
+    logger.info(f"   Generated images are ready for refinement in GIMP or other editors.")
@@ -3,17 +3,95 @@
 Complete Pipeline Example
 Demonstrates the full workflow: prompt → generate → enhance → animate → optimize
 """
+import io
+import logging
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add MCP directory to path
 sys.path.insert(0, str(Path(__file__).parent / "MCP" / "gimp-image-gen"))
-from gimp_image_gen import generate_image_with_ai
+from gimp_image_gen import generate_image_with_ai, generate_images_with_ai
 from enhance_image import ImageEnhancer
 from generate_animation import AnimationGenerator
 
 
+def _is_interactive():
+    """Whether to pause between demos (disabled without a TTY or with DEMO_NONINTERACTIVE)"""
+    return sys.stdin.isatty() and not os.environ.get('DEMO_NONINTERACTIVE')
+
+
+def _pause(message):
+    """Wait for Enter when running interactively"""
+    if _is_interactive():
+        input(message)
+
+
+class _ThreadOutput:
+    """Stand-in for sys.stdout that gives each demo thread its own buffer"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (self._stream if buffer is None else buffer).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+    
+    def capture(self, demo):
+        """Run demo, returning (its output, the exception it raised or None)"""
+        self._local.buffer = io.StringIO()
+        try:
+            demo()
+            error = None
+        except Exception as e:
+            error = e
+        output = self._local.buffer.getvalue()
+        self._local.buffer = None
+        return output, error
+
+
+def _run_demos_concurrently(demos):
+    """
+    Run independent demos in parallel threads.
+    
+    The demos spend most of their time waiting on the AI APIs, and each one
+    writes to its own files under demo_output/, so they can overlap safely.
+    Each demo's output (prints and log messages from its own thread) is
+    buffered and shown in demo order, so the demos read the same as when run
+    one after another.
+    """
+    stdout = sys.stdout
+    output = _ThreadOutput(stdout)
+    # Log handlers keep their own reference to stdout, so point them at the buffers too
+    handlers = [handler for handler in logging.getLogger().handlers
+                if isinstance(handler, logging.StreamHandler) and handler.stream is stdout]
+    sys.stdout = output
+    for handler in handlers:
+        handler.setStream(output)
+    try:
+        with ThreadPoolExecutor(max_workers=len(demos)) as executor:
+            futures = [executor.submit(output.capture, demo) for demo in demos]
+            for future in futures:
+                text, error = future.result()
+                stdout.write(text)
+                stdout.flush()
+                if error is not None:
+                    raise error
+    finally:
+        sys.stdout = stdout
+        for handler in handlers:
+            handler.setStream(stdout)
+
+
 def demo_single_image_workflow():
     """Demonstrate single image generation with enhancement"""
     print("\n" + "="*60)
@@ -26,7 +104,7 @@ def demo_single_image_workflow():
     
     print("Step 1: Generating image with AI...")
     os.makedirs("demo_output", exist_ok=True)
-    generate_image_with_ai(prompt, raw_output)
+    generate_image_with_ai(prompt, raw_output, fast=True)
     print(f"✓ Generated: {raw_output}\n")
     
     # Step 2: Enhance image
@@ -103,10 +181,11 @@ def demo_batch_enhancement():
         "Simple geometric pattern, orange and purple"
     ]
     
-    for idx, prompt in enumerate(test_prompts, 1):
-        frame_path = f"demo_output/test_frames/frame_{idx:04d}.png"
-        generate_image_with_ai(prompt, frame_path)
-        print(f"  Created: frame_{idx:04d}.png")
+    frame_paths = [f"demo_output/test_frames/frame_{idx:04d}.png"
+                   for idx in range(1, len(test_prompts) + 1)]
+    generate_images_with_ai(test_prompts, frame_paths)
+    for frame_path in frame_paths:
+        print(f"  Created: {os.path.basename(frame_path)}")
     
     print("\nEnhancing frames in batch...")
     
@@ -140,7 +219,7 @@ def demo_comparison():
     
     print("Generating base image...")
     os.makedirs("demo_output", exist_ok=True)
-    generate_image_with_ai(prompt, base_image)
+    generate_image_with_ai(prompt, base_image, fast=True)
     print(f"✓ Generated: {base_image}\n")
     
     # Test each preset
@@ -167,6 +246,9 @@ def demo_comparison():
 
 def main():
     """Run all demos"""
+    # Show progress messages from the generator modules
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     print("\n" + "="*60)
     print("🎨 GIMP MCP - Complete Pipeline Demo")
     print("="*60)
@@ -178,20 +260,24 @@ def main():
     print("\nAll outputs will be saved to demo_output/")
     print("="*60)
     
-    input("\nPress Enter to start the demos...")
+    _pause("\nPress Enter to start the demos...")
+    
+    demos = [
+        demo_single_image_workflow,
+        demo_animation_workflow,
+        demo_batch_enhancement,
+        demo_comparison
+    ]
     
     try:
         # Run demos
-        demo_single_image_workflow()
-        input("Press Enter to continue to next demo...")
-        
-        demo_animation_workflow()
-        input("Press Enter to continue to next demo...")
-        
-        demo_batch_enhancement()
-        input("Press Enter to continue to next demo...")
-        
-        demo_comparison()
+        if _is_interactive():
+            for idx, demo in enumerate(demos):
+                if idx > 0:
+                    input("Press Enter to continue to next demo...")
+                demo()
+        else:
+            _run_demos_concurrently(demos)
         
         print("\n" + "="*60)
         print("✓ All demos complete!")
@@ -6,12 +6,232 @@ Applies quality improvements to AI-generated images using Pillow and optional GI
 import os
 import sys
 import argparse
+import contextlib
+import functools
+import logging
+import mmap
+import queue
+import shutil
+import string
+import threading
+import time
+from collections import deque
 from pathlib import Path
+import numpy as np
 from PIL import Image, ImageEnhance, ImageFilter
 import subprocess
-import tempfile
 import json
 
+# Optional: OpenCV's SIMD median filter is much faster than Pillow's
+try:
+    import cv2
+    OPENCV_AVAILABLE = True
+except ImportError:
+    OPENCV_AVAILABLE = False
+
+# Optional: libvips can encode PNG output instead of Pillow
+try:
+    import pyvips
+    VIPS_AVAILABLE = True
+except (ImportError, OSError):
+    VIPS_AVAILABLE = False
+
+# Optional: Numba spreads the tone-curve pass of very large frames across cores
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# The parallel kernel only beats Pillow's single-threaded img.point on large
+# frames with several cores to spread the rows over
+NUMBA_MIN_PIXELS = 4_000_000
+NUMBA_MIN_CPUS = 4
+
+logger = logging.getLogger(__name__)
+
+# Windows caps a command line at 8191 characters; longer Script-Fu goes
+# through GIMP's stdin instead
+WINDOWS_CMDLINE_LIMIT = 8000
+
+# Environment variables passed through to GIMP; everything else is dropped so
+# spawning it doesn't copy the whole parent environment
+GIMP_ENV_KEYS = (
+    'PATH', 'HOME', 'USER', 'LANG', 'LC_ALL', 'TMPDIR', 'TEMP', 'TMP',
+    'XDG_CONFIG_HOME', 'XDG_CACHE_HOME', 'XDG_DATA_HOME', 'GIMP2_DIRECTORY',
+    'SYSTEMROOT', 'APPDATA', 'LOCALAPPDATA', 'USERPROFILE',
+)
+
+# Encoders save_png can write frames with
+PNG_ENCODERS = ('pil', 'cv2', 'vips')
+
+# Printed by a persistent GIMP batch process after each image it finishes
+BATCH_SENTINEL = "GIMPMCP-BATCH-DONE"
+
+# Seconds GIMP gets per image, whether one-shot or in a batch process
+GIMP_TIMEOUT = 60
+
+# Recent stderr lines kept from a batch process for error messages
+BATCH_STDERR_LINES = 50
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True)
+    def _apply_lut_parallel(arr, lut):
+        """Map each pixel of an HxWxC uint8 array through lut[channel], rows in parallel"""
+        height, width, channels = arr.shape
+        out = np.empty_like(arr)
+        for y in prange(height):
+            for x in range(width):
+                for c in range(channels):
+                    out[y, x, c] = lut[c, arr[y, x, c]]
+        return out
+
+
+# Compare-swap pairs of the 19-comparator 3x3 median network (Paeth); after
+# running them the middle slot holds the median of the nine inputs
+_MEDIAN9_NETWORK = (
+    (1, 2), (4, 5), (7, 8), (0, 1), (3, 4), (6, 7), (1, 2), (4, 5), (7, 8),
+    (0, 3), (5, 8), (4, 7), (3, 6), (1, 4), (2, 5), (4, 7), (4, 2), (6, 4),
+    (4, 2),
+)
+
+
+def _median3x3(arr):
+    """
+    3x3 median filter over an (H, W) or (H, W, C) uint8 array
+    
+    Each compare-swap of the sorting network is an element-wise min/max over
+    whole shifted views of the image, so NumPy's SIMD loops do the work
+    instead of a per-pixel sort. Borders are edge-replicated like Pillow's
+    MedianFilter.
+    """
+    h, w = arr.shape[:2]
+    pad = ((1, 1), (1, 1)) + ((0, 0),) * (arr.ndim - 2)
+    padded = np.pad(arr, pad, mode='edge')
+    p = [padded[dy:dy + h, dx:dx + w] for dy in range(3) for dx in range(3)]
+    
+    for a, b in _MEDIAN9_NETWORK:
+        p[a], p[b] = np.minimum(p[a], p[b]), np.maximum(p[a], p[b])
+    
+    return np.ascontiguousarray(p[4])
+
+
+def load_image(image_path):
+    """
+    Decode an image file through a read-only memory map
+    
+    The decoder reads straight from the page cache instead of going through
+    read() calls into intermediate Python buffers. The image is fully loaded
+    before the mapping is closed, so it can be used like any other.
+    
+    Args:
+        image_path (str): Path to the image file
+        
+    Returns:
+        PIL.Image.Image: The decoded image
+    """
+    with open(image_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # mmap can't map an empty file; let Pillow report it as unreadable
+            return Image.open(image_path)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            img = Image.open(mapped)
+            img.load()
+            return img
+
+
+def png_encoder_available(encoder):
+    """Whether save_png can use the given encoder in this environment"""
+    return {'pil': True, 'cv2': OPENCV_AVAILABLE, 'vips': VIPS_AVAILABLE}.get(encoder, False)
+
+
+def save_png(img, output_path, encoder='pil', fast=False):
+    """
+    Save an image as PNG with Pillow, OpenCV or libvips
+    
+    Modes the chosen encoder can't take directly (e.g. palette images), and
+    encoders that aren't installed, fall back to Pillow.
+    
+    Args:
+        img (PIL.Image.Image): Image to save
+        output_path (str): Destination path
+        encoder (str): One of PNG_ENCODERS
+        fast (bool): Use light zlib compression (for intermediate frames)
+    """
+    level = 1 if fast else 6
+    
+    if encoder == 'cv2' and OPENCV_AVAILABLE and img.mode in ('L', 'RGB', 'RGBA'):
+        arr = np.asarray(img)
+        if img.mode == 'RGB':
+            arr = cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+        elif img.mode == 'RGBA':
+            arr = cv2.cvtColor(arr, cv2.COLOR_RGBA2BGRA)
+        # Encode in memory so the output is PNG whatever the file extension
+        ok, encoded = cv2.imencode('.png', arr, [cv2.IMWRITE_PNG_COMPRESSION, level])
+        if not ok:
+            raise OSError(f"OpenCV could not encode {output_path}")
+        encoded.tofile(output_path)
+        return
+    
+    if encoder == 'vips' and VIPS_AVAILABLE and img.mode in ('L', 'RGB', 'RGBA'):
+        pyvips.Image.new_from_array(np.asarray(img)).pngsave(output_path, compression=level)
+        return
+    
+    save_args = {'compress_level': 1, 'optimize': False} if fast else {}
+    img.save(output_path, 'PNG', **save_args)
+
+
+@functools.lru_cache(maxsize=8)
+def _gimp_script_template(despeckle, auto_levels, sharpen):
+    """
+    Script-Fu for one combination of GIMP operations, built once per combination
+    
+    Only the file names change between frames, so they are left as
+    $input_file / $output_file placeholders for string.Template.
+    """
+    script = """
+(define (enhance-image input-file output-file)
+  (let* ((image (car (gimp-file-load RUN-NONINTERACTIVE input-file input-file)))
+         (drawable (car (gimp-image-get-active-layer image))))
+    
+"""
+    
+    # Despeckle
+    if despeckle:
+        script += """
+    ; Despeckle to remove artifacts
+    (plug-in-despeckle RUN-NONINTERACTIVE image drawable 3 1 7 248)
+"""
+    
+    # Auto levels (histogram stretch)
+    if auto_levels:
+        script += """
+    ; Auto levels
+    (gimp-levels-stretch drawable)
+"""
+    
+    # Unsharp mask for sharpening
+    if sharpen > 0:
+        radius = min(5.0, sharpen * 5)
+        amount = min(1.5, sharpen * 2)
+        script += f"""
+    ; Unsharp mask
+    (plug-in-unsharp-mask RUN-NONINTERACTIVE image drawable {radius} {amount} 0)
+"""
+    
+    # Save and cleanup
+    script += """
+    ; Save result
+    (file-png-save RUN-NONINTERACTIVE image drawable output-file output-file 0 9 0 0 0 0 0)
+    
+    ; Cleanup
+    (gimp-image-delete image)))
+
+(enhance-image $input_file $output_file)
+"""
+    
+    return string.Template(script)
+
 
 class ImageEnhancer:
     """Enhance images with auto-levels, denoise, sharpen, and artifact removal"""
@@ -56,33 +276,144 @@ class ImageEnhancer:
         """
         self.use_gimp = use_gimp
         self.gimp_path = gimp_path or self._find_gimp()
+        self._batch = None
+        self._batch_stdout = None
+        self._batch_stderr = None
         
         if use_gimp and not self.gimp_path:
-            print("⚠ GIMP not found. Falling back to Pillow-only enhancement.")
+            logger.warning("⚠ GIMP not found. Falling back to Pillow-only enhancement.")
             self.use_gimp = False
     
-    def _find_gimp(self):
-        """Auto-detect GIMP installation"""
+    @contextlib.contextmanager
+    def open_batch(self):
+        """
+        Keep one GIMP process running for every enhance() call in the block
+        
+        GIMP takes seconds to start and load its plug-ins, so enhancing many
+        frames one process at a time is dominated by startup. Inside this
+        context each image's Script-Fu is streamed to a single `gimp -i -b -`
+        process instead. Without GIMP enabled this is a no-op.
+        """
+        if not self.use_gimp or self._batch is not None:
+            yield self
+            return
+        
+        self._batch = subprocess.Popen(
+            [self.gimp_path, '-i', '-b', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            env=self._gimp_env(),
+            close_fds=True
+        )
+        
+        # Reader threads drain both pipes, so waiting for the sentinel can time
+        # out and GIMP never stalls on a full stderr pipe
+        self._batch_stdout = queue.Queue()
+        self._batch_stderr = deque(maxlen=BATCH_STDERR_LINES)
+        
+        def pump(stream, put):
+            for line in stream:
+                put(line)
+            put(None)
+        
+        for stream, put in ((self._batch.stdout, self._batch_stdout.put),
+                            (self._batch.stderr, self._batch_stderr.append)):
+            threading.Thread(target=pump, args=(stream, put), daemon=True).start()
+        
+        try:
+            yield self
+        finally:
+            self.close_batch()
+    
+    def close_batch(self):
+        """Shut down the persistent GIMP process started by open_batch()"""
+        batch, self._batch = self._batch, None
+        if batch is None:
+            return
+        try:
+            batch.stdin.write('(gimp-quit 0)\n')
+            batch.stdin.close()
+            batch.wait(timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            batch.kill()
+            batch.wait()
+    
+    def _kill_batch(self):
+        """Kill the persistent GIMP process without asking it to quit"""
+        batch, self._batch = self._batch, None
+        if batch is not None:
+            batch.kill()
+            batch.wait()
+    
+    def _with_batch_errors(self, message):
+        """Append GIMP's recent stderr output from the batch process to message"""
+        errors = ''.join(line for line in list(self._batch_stderr) if line).strip()
+        return f"{message}: {errors}" if errors else message
+    
+    def _run_batch_script(self, script):
+        """
+        Evaluate a script in the persistent GIMP process and wait for it
+        
+        Returns:
+            bool: True once GIMP has finished the script, False if it exited
+            
+        Raises:
+            subprocess.TimeoutExpired: GIMP didn't finish within GIMP_TIMEOUT
+        """
+        batch = self._batch
+        if batch.poll() is not None:
+            # Keep whatever GIMP printed before exiting for the error message
+            return False
+        self._batch_stderr.clear()
+        batch.stdin.write(script)
+        batch.stdin.write(f'\n(display "{BATCH_SENTINEL}")\n(newline)\n')
+        batch.stdin.flush()
+        
+        # Script-Fu errors are reported and the interpreter carries on, so
+        # the sentinel always follows; success is judged by the output file
+        deadline = time.monotonic() + GIMP_TIMEOUT
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                line = self._batch_stdout.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                raise subprocess.TimeoutExpired(batch.args, GIMP_TIMEOUT)
+            if line is None:
+                return False
+            if BATCH_SENTINEL in line:
+                return True
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _gimp_env():
+        """Minimal environment for GIMP batch processes (built once)"""
+        env = {key: os.environ[key] for key in GIMP_ENV_KEYS if key in os.environ}
+        # Batch mode never opens a window
+        env['DISPLAY'] = ''
+        return env
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _find_gimp():
+        """Auto-detect GIMP installation (cached for all enhancer instances)"""
         possible_paths = [
             '/Applications/GIMP.app/Contents/MacOS/gimp',
             '/usr/local/bin/gimp',
-            '/usr/bin/gimp',
-            'gimp'  # System PATH
+            '/usr/bin/gimp'
         ]
         
+        # Check for the executable directly instead of spawning `gimp --version`
         for path in possible_paths:
-            try:
-                result = subprocess.run([path, '--version'], 
-                                      capture_output=True, 
-                                      timeout=5)
-                if result.returncode == 0:
-                    return path
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                continue
+            if os.path.isfile(path) and os.access(path, os.X_OK):
+                return path
         
-        return None
+        # System PATH
+        return shutil.which('gimp')
     
-    def enhance(self, image_path, output_path, preset='medium', operations=None):
+    def enhance(self, image_path, output_path, preset='medium', operations=None, fast=False,
+                quiet=False, encoder='pil'):
         """
         Enhance an image using the specified preset or custom operations
         
@@ -91,10 +422,15 @@ class ImageEnhancer:
             output_path (str): Path to save enhanced image
             preset (str): Enhancement preset (light|medium|aggressive)
             operations (dict): Custom operations to override preset
+            fast (bool): Save with light PNG compression (for intermediate frames)
+            quiet (bool): Log progress at debug level, e.g. inside frame batches
+            encoder (str): PNG encoder for Pillow-produced output (pil|cv2|vips)
             
         Returns:
             dict: Result with status, message, and output path
         """
+        log = logger.debug if quiet else logger.info
+        
         try:
             if not os.path.exists(image_path):
                 return self._error("input_not_found", f"Input image not found: {image_path}")
@@ -105,168 +441,329 @@ class ImageEnhancer:
                     return self._error("invalid_preset", f"Unknown preset: {preset}")
                 operations = self.PRESETS[preset].copy()
             
-            print(f"\n{'='*60}")
-            print(f"🎨 Enhancing image: {os.path.basename(image_path)}")
-            print(f"📋 Preset: {preset}")
-            print(f"{'='*60}\n")
+            log(f"\n{'='*60}")
+            log(f"🎨 Enhancing image: {os.path.basename(image_path)}")
+            log(f"📋 Preset: {preset}")
+            log(f"{'='*60}\n")
             
             # Create output directory
             os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
             # Open image
-            img = Image.open(image_path)
-            original_mode = img.mode
-            
-            # Convert to RGB for processing if needed
-            if img.mode not in ('RGB', 'RGBA'):
-                img = img.convert('RGB')
+            img = load_image(image_path)
             
             # Apply PIL-based enhancements
-            img = self._apply_pil_enhancements(img, operations)
+            img = self.enhance_image(img, operations=operations)
             
             # Apply GIMP-based enhancements if enabled
             if self.use_gimp:
-                temp_path = output_path + '.temp.png'
-                img.save(temp_path, 'PNG')
+                # The handoff is only read back by GIMP, so write it
+                # uncompressed: PPM/PGM, or stored PNG for images with alpha
+                if img.mode == 'RGBA':
+                    temp_path = output_path + '.temp.png'
+                    img.save(temp_path, 'PNG', compress_level=0)
+                else:
+                    temp_path = output_path + '.temp.ppm'
+                    img.save(temp_path, 'PPM')
                 result = self._apply_gimp_enhancements(temp_path, output_path, operations)
                 
                 if result['status'] == 'error':
-                    print(f"⚠ GIMP enhancement failed: {result['message']}")
-                    print("  Falling back to PIL-only result")
-                    img.save(output_path, 'PNG')
-                else:
-                    # GIMP succeeded, clean up temp file
-                    if os.path.exists(temp_path):
-                        os.remove(temp_path)
+                    logger.warning(f"⚠ GIMP enhancement failed: {result['message']}")
+                    logger.warning("  Falling back to PIL-only result")
+                    save_png(img, output_path, encoder, fast)
+                
+                # The handoff file is no longer needed either way
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
             else:
                 # Save PIL-enhanced image
-                img.save(output_path, 'PNG')
+                save_png(img, output_path, encoder, fast)
             
             file_size = os.path.getsize(output_path) / 1024  # KB
-            print(f"\n✓ Enhancement complete: {output_path}")
-            print(f"  File size: {file_size:.2f} KB")
-            print(f"{'='*60}\n")
+            log(f"\n✓ Enhancement complete: {output_path}")
+            log(f"  File size: {file_size:.2f} KB")
+            log(f"{'='*60}\n")
             
             return self._success(output_path)
             
         except Exception as e:
             return self._error("enhancement_failed", str(e))
     
+    def enhance_image(self, img, preset='medium', operations=None):
+        """
+        Apply the Pillow enhancements to an already decoded image
+        
+        This is the in-memory part of enhance(): no file I/O and no GIMP pass,
+        for callers that read and write frames themselves.
+        
+        Args:
+            img (PIL.Image.Image): Image to enhance
+            preset (str): Enhancement preset (light|medium|aggressive)
+            operations (dict): Custom operations to override preset
+            
+        Returns:
+            PIL.Image.Image: The enhanced image
+        """
+        if operations is None:
+            if preset not in self.PRESETS:
+                raise ValueError(f"Unknown preset: {preset}")
+            operations = self.PRESETS[preset]
+        
+        # Convert to RGB for processing if needed. Grayscale stays
+        # single-channel: every operation supports 'L' and saturation
+        # has no effect on it, so expanding it to RGB only triples the work.
+        if img.mode not in ('L', 'RGB', 'RGBA'):
+            img = img.convert('RGB')
+        
+        return self._apply_pil_enhancements(img, operations)
+    
     def _apply_pil_enhancements(self, img, operations):
         """Apply PIL-based image enhancements"""
-        print("🔧 Applying PIL enhancements...")
+        logger.debug("🔧 Applying PIL enhancements...")
         
-        # Auto levels (histogram stretch)
+        # Auto levels, brightness and contrast are per-channel tone curves, so
+        # they are composed into one lookup table and applied in a single
+        # pass. The median filter commutes with monotonic tone curves, which
+        # lets the denoise run first; the stretch range is still measured on
+        # the undenoised image, as when auto levels ran first.
+        levels = None
         if operations.get('auto_levels'):
-            print("  • Auto levels")
-            img = self._auto_levels(img)
+            logger.debug("  • Auto levels")
+            levels = self._levels_range(img)
         
         # Denoise (median filter)
         denoise_level = operations.get('denoise', 0)
         if denoise_level > 0:
-            print(f"  • Denoise (level {denoise_level})")
-            for _ in range(denoise_level):
-                img = img.filter(ImageFilter.MedianFilter(size=3))
+            logger.debug(f"  • Denoise (level {denoise_level})")
+            img = self._median_denoise(img, denoise_level)
         
         # Brightness adjustment
         brightness = operations.get('brightness', 1.0)
         if brightness != 1.0:
-            print(f"  • Brightness ({brightness:.2f})")
-            enhancer = ImageEnhance.Brightness(img)
-            img = enhancer.enhance(brightness)
+            logger.debug(f"  • Brightness ({brightness:.2f})")
         
         # Contrast adjustment
         contrast = operations.get('contrast', 1.0)
         if contrast != 1.0:
-            print(f"  • Contrast ({contrast:.2f})")
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(contrast)
+            logger.debug(f"  • Contrast ({contrast:.2f})")
+        
+        if levels is not None or brightness != 1.0 or contrast != 1.0:
+            img = self._apply_lut(img, self._tone_lut(img, levels, brightness, contrast))
         
         # Saturation adjustment
         saturation = operations.get('saturation', 1.0)
-        if saturation != 1.0:
-            print(f"  • Saturation ({saturation:.2f})")
-            enhancer = ImageEnhance.Color(img)
-            img = enhancer.enhance(saturation)
+        if saturation != 1.0 and img.mode != 'L':
+            logger.debug(f"  • Saturation ({saturation:.2f})")
+            img = self._saturate(img, saturation)
         
         # Sharpening
         sharpen = operations.get('sharpen', 0)
         if sharpen > 0:
-            print(f"  • Sharpen ({sharpen:.2f})")
+            logger.debug(f"  • Sharpen ({sharpen:.2f})")
             enhancer = ImageEnhance.Sharpness(img)
             img = enhancer.enhance(1.0 + sharpen)
         
         return img
     
-    def _auto_levels(self, img):
-        """Stretch histogram to improve contrast"""
+    def _median_denoise(self, img, passes):
+        """Apply a 3x3 median filter the given number of times"""
         if img.mode not in ('L', 'RGB', 'RGBA'):
+            for _ in range(passes):
+                img = img.filter(ImageFilter.MedianFilter(size=3))
             return img
         
-        # Get histogram and stretch it
-        extrema = img.getextrema()
+        # Convert once and keep the array across all passes
+        arr = np.asarray(img)
+        alpha = None
+        if img.mode == 'RGBA':
+            arr, alpha = arr[..., :3], arr[..., 3]
+        arr = np.ascontiguousarray(arr)
+        
+        for _ in range(passes):
+            arr = cv2.medianBlur(arr, 3) if OPENCV_AVAILABLE else _median3x3(arr)
+        
+        if alpha is not None:
+            arr = np.dstack((arr, alpha))
+        
+        return Image.fromarray(arr)
+    
+    def _saturate(self, img, factor):
+        """
+        Scale saturation in a single color-matrix pass
+        
+        ImageEnhance.Color builds a grayscale copy, converts it back to the
+        image mode and blends the two. The same blend towards luma is a linear
+        map of R, G and B, so Pillow's matrix convert applies it directly.
+        Results match ImageEnhance.Color to within one level.
+        """
+        rgb, alpha = img, None
+        if img.mode == 'RGBA':
+            rgb, alpha = img.convert('RGB'), img.getchannel('A')
+        
+        # Luma weights of Pillow's RGB -> L conversion; the -0.5 offset
+        # mirrors the truncation in Image.blend
+        r, g, b = 19595 / 65536, 38470 / 65536, 7471 / 65536
+        k = 1.0 - factor
+        matrix = (
+            factor + k * r, k * g, k * b, -0.5,
+            k * r, factor + k * g, k * b, -0.5,
+            k * r, k * g, factor + k * b, -0.5,
+        )
+        rgb = rgb.convert('RGB', matrix)
         
+        if alpha is not None:
+            rgb.putalpha(alpha)
+        return rgb
+    
+    def _levels_range(self, img):
+        """
+        Measure the per-channel histogram stretch for auto levels
+        
+        Returns:
+            tuple: (lo, scale) float arrays with one entry per color channel
+                (flat channels map to identity), or None for unsupported modes
+        """
+        if img.mode not in ('L', 'RGB', 'RGBA'):
+            return None
+        
+        arr = np.asarray(img)
         if img.mode == 'L':
-            # Grayscale
-            if extrema[0] == extrema[1]:
-                return img
-            scale = 255.0 / (extrema[1] - extrema[0])
-            offset = -extrema[0] * scale
-            return img.point(lambda x: x * scale + offset)
+            color = arr.reshape(-1, 1)
         else:
-            # RGB/RGBA - process each channel
-            channels = img.split()
-            processed = []
-            
-            for i, channel in enumerate(channels):
-                if i < 3:  # Only process RGB, not alpha
-                    extrema_c = channel.getextrema()
-                    if extrema_c[0] != extrema_c[1]:
-                        scale = 255.0 / (extrema_c[1] - extrema_c[0])
-                        offset = -extrema_c[0] * scale
-                        channel = channel.point(lambda x: x * scale + offset)
-                processed.append(channel)
+            # Only stretch RGB, not alpha
+            color = arr[..., :3].reshape(-1, 3)
+        
+        lo = color.min(axis=0).astype(np.float32)
+        hi = color.max(axis=0).astype(np.float32)
+        
+        flat = hi == lo
+        scale = np.where(flat, 1.0, 255.0 / np.maximum(hi - lo, 1))
+        lo = np.where(flat, 0.0, lo)
+        
+        return lo.astype(np.float32), scale.astype(np.float32)
+    
+    def _tone_lut(self, img, levels, brightness, contrast):
+        """
+        Build one lookup table that applies auto levels, brightness and contrast
+        
+        Each stage reproduces the separate pass it replaces: the levels
+        stretch, ImageEnhance.Brightness (scale towards black) and
+        ImageEnhance.Contrast (scale around the mean gray level of the image
+        after the earlier stages).
+        
+        Args:
+            img (PIL.Image): Image the table will be applied to (L, RGB or RGBA)
+            levels (tuple): (lo, scale) from _levels_range, or None to skip
+            brightness (float): Brightness factor
+            contrast (float): Contrast factor
             
-            return Image.merge(img.mode, processed)
+        Returns:
+            np.ndarray: uint8 lookup table of shape (bands, 256)
+        """
+        n_color = 1 if img.mode == 'L' else 3
+        curves = np.tile(np.arange(256, dtype=np.float32), (n_color, 1))
+        
+        if levels is not None:
+            lo, scale = levels
+            # Rounded like the linear point transform the separate pass used
+            curves = np.clip(np.floor((curves - lo[:, None]) * scale[:, None] + 0.5), 0, 255)
+        
+        if brightness != 1.0:
+            curves = np.floor(np.clip(curves * brightness, 0, 255))
+        
+        if contrast != 1.0:
+            # Mean gray level of the image once the earlier stages are applied
+            hist = np.asarray(img.histogram(), dtype=np.float64).reshape(-1, 256)[:n_color]
+            means = (hist * curves).sum(axis=1) / hist.sum(axis=1)
+            if n_color == 1:
+                gray = means[0]
+            else:
+                gray = float(np.dot(means, (0.299, 0.587, 0.114)))
+            mean = int(gray + 0.5)
+            curves = np.floor(np.clip(mean + (curves - mean) * contrast, 0, 255))
+        
+        lut = curves.astype(np.uint8)
+        if img.mode == 'RGBA':
+            # Leave alpha untouched
+            lut = np.vstack((lut, np.arange(256, dtype=np.uint8)))
+        
+        return lut
+    
+    def _apply_lut(self, img, lut):
+        """Apply a (bands, 256) lookup table from _tone_lut to an image"""
+        if (NUMBA_AVAILABLE and img.width * img.height >= NUMBA_MIN_PIXELS
+                and (os.cpu_count() or 1) >= NUMBA_MIN_CPUS):
+            arr = np.asarray(img)
+            out = _apply_lut_parallel(arr.reshape(img.height, img.width, -1), lut)
+            return Image.fromarray(out.reshape(arr.shape))
+        
+        return img.point(lut.ravel().tolist())
     
     def _apply_gimp_enhancements(self, input_path, output_path, operations):
         """Apply GIMP batch enhancements using Script-Fu"""
-        print("🎨 Applying GIMP enhancements...")
+        logger.debug("🎨 Applying GIMP enhancements...")
         
         # Build GIMP Script-Fu commands
         script = self._build_gimp_script(input_path, output_path, operations)
         
-        try:
-            # Write script to temp file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.scm', delete=False) as f:
-                f.write(script)
-                script_path = f.name
+        # Script-Fu errors don't make GIMP fail, so success is judged by the
+        # output file; a stale one from an earlier run must not count
+        if os.path.lexists(output_path):
+            os.remove(output_path)
+        
+        if self._batch is not None:
+            try:
+                if not self._run_batch_script(script):
+                    message = self._with_batch_errors("GIMP batch process exited unexpectedly")
+                    self.close_batch()
+                    return self._error("gimp_failed", message)
+            except subprocess.TimeoutExpired:
+                # A hung GIMP would block every later frame; later ones run one-shot
+                self._kill_batch()
+                return self._error("gimp_timeout", "GIMP operation timed out")
+            except OSError as e:
+                message = self._with_batch_errors(str(e))
+                self.close_batch()
+                return self._error("gimp_error", message)
             
-            # Run GIMP in batch mode
-            cmd = [
-                self.gimp_path,
-                '-i',  # No interface
-                '-b', f'(load "{script_path}")',
-                '-b', '(gimp-quit 0)'
-            ]
+            if not os.path.exists(output_path):
+                return self._error("gimp_no_output",
+                                   self._with_batch_errors("GIMP did not produce output file"))
+            
+            logger.debug("  ✓ GIMP enhancement complete")
+            return self._success(output_path)
+        
+        try:
+            # Hand the script to GIMP directly as a batch command instead of
+            # writing a temporary .scm file for it to (load ...)
+            cmd = [self.gimp_path, '-i']  # No interface
+            stdin_script = None
+            if os.name == 'nt' and len(script) > WINDOWS_CMDLINE_LIMIT:
+                # Too long for the Windows command line: '-b -' makes GIMP
+                # read the batch commands from stdin instead
+                cmd += ['-b', '-']
+                stdin_script = script
+            else:
+                cmd += ['-b', script]
+            cmd += ['-b', '(gimp-quit 0)']
             
             result = subprocess.run(
                 cmd,
+                input=stdin_script,
                 capture_output=True,
-                timeout=60,
-                text=True
+                timeout=GIMP_TIMEOUT,
+                text=True,
+                env=self._gimp_env(),
+                close_fds=True
             )
             
-            # Clean up script
-            os.remove(script_path)
-            
             if result.returncode != 0:
                 return self._error("gimp_failed", f"GIMP returned error: {result.stderr}")
             
             if not os.path.exists(output_path):
                 return self._error("gimp_no_output", "GIMP did not produce output file")
             
-            print("  ✓ GIMP enhancement complete")
+            logger.debug("  ✓ GIMP enhancement complete")
             return self._success(output_path)
             
         except subprocess.TimeoutExpired:
@@ -276,49 +773,20 @@ class ImageEnhancer:
     
     def _build_gimp_script(self, input_path, output_path, operations):
         """Build Script-Fu code for GIMP batch processing"""
-        script = f"""
-(define (enhance-image input-file output-file)
-  (let* ((image (car (gimp-file-load RUN-NONINTERACTIVE input-file input-file)))
-         (drawable (car (gimp-image-get-active-layer image))))
-    
-"""
-        
-        # Despeckle
-        if operations.get('despeckle'):
-            script += """
-    ; Despeckle to remove artifacts
-    (plug-in-despeckle RUN-NONINTERACTIVE image drawable 3 1 7 248)
-"""
-        
-        # Auto levels (histogram stretch)
-        if operations.get('auto_levels'):
-            script += """
-    ; Auto levels
-    (gimp-levels-stretch drawable)
-"""
-        
-        # Unsharp mask for sharpening
-        sharpen = operations.get('sharpen', 0)
-        if sharpen > 0:
-            radius = min(5.0, sharpen * 5)
-            amount = min(1.5, sharpen * 2)
-            script += f"""
-    ; Unsharp mask
-    (plug-in-unsharp-mask RUN-NONINTERACTIVE image drawable {radius} {amount} 0)
-"""
-        
-        # Save and cleanup
-        script += f"""
-    ; Save result
-    (file-png-save RUN-NONINTERACTIVE image drawable "{output_path}" "{output_path}" 0 9 0 0 0 0 0)
+        template = _gimp_script_template(
+            bool(operations.get('despeckle')),
+            bool(operations.get('auto_levels')),
+            operations.get('sharpen', 0)
+        )
+        return template.substitute(
+            input_file=self._scheme_string(input_path),
+            output_file=self._scheme_string(output_path)
+        )
     
-    ; Cleanup
-    (gimp-image-delete image)))
-
-(enhance-image "{input_path}" "{output_path}")
-"""
-        
-        return script
+    @staticmethod
+    def _scheme_string(value):
+        """Quote a Python string as a Script-Fu string literal"""
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
     
     def _success(self, output_path):
         """Return success result"""
@@ -371,9 +839,19 @@ def main():
         action='store_true',
         help="Output result as JSON"
     )
+    parser.add_argument(
+        '-v', '--verbose',
+        action='store_true',
+        help="Also list each enhancement step as it is applied"
+    )
     
     args = parser.parse_args()
     
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    if args.verbose:
+        # Only this module's step list, not third-party debug output
+        logger.setLevel(logging.DEBUG)
+    
     # Determine output path
     if args.output:
         output_path = args.output
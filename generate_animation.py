@@ -6,9 +6,33 @@ Generates a sequence of PNG images and compiles them into an animated GIF
 import os
 import sys
 import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 from PIL import Image
 
+# Optional: imageio (with imageio-ffmpeg) writes MP4 output
+try:
+    import imageio.v2 as imageio
+    IMAGEIO_AVAILABLE = True
+except ImportError:
+    IMAGEIO_AVAILABLE = False
+
+# Optional progress bar
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+logger = logging.getLogger(__name__)
+
+# Up to this many frames are sampled to build the shared GIF palette
+GIF_PALETTE_SAMPLES = 8
+
+# Container formats create_animation() can write
+ANIMATION_FORMATS = ('gif', 'webp', 'mp4')
+
 # Add MCP directory to path
 sys.path.insert(0, str(Path(__file__).parent / "MCP" / "gimp-image-gen"))
 from gimp_image_gen import generate_image, generate_image_with_ai
@@ -16,7 +40,7 @@ from gimp_image_gen import generate_image, generate_image_with_ai
 # Import enhancement modules
 try:
     from enhance_image import ImageEnhancer
-    from preprocess_frames import FramePreprocessor
+    from preprocess_frames import FramePreprocessor, read_manifest
     ENHANCEMENT_AVAILABLE = True
 except ImportError:
     ENHANCEMENT_AVAILABLE = False
@@ -26,7 +50,8 @@ class AnimationGenerator:
     """Generate animated GIF from a sequence of text prompts"""
     
     def __init__(self, output_dir="animations", frame_rate=10, resolution=(512, 512), 
-                 enhance=False, enhancement_preset='medium', use_gimp=False):
+                 enhance=False, enhancement_preset='medium', use_gimp=False, workers=None,
+                 keep_frames=True):
         """
         Initialize animation generator
         
@@ -37,6 +62,8 @@ class AnimationGenerator:
             enhance (bool): Whether to enhance frames after generation
             enhancement_preset (str): Enhancement preset (light|medium|aggressive)
             use_gimp (bool): Whether to use GIMP for enhancement
+            workers (int): Number of frames generated in parallel (default: half the CPUs)
+            keep_frames (bool): Keep the frame PNGs once the animation is written
         """
         self.output_dir = output_dir
         self.frame_rate = frame_rate
@@ -45,13 +72,21 @@ class AnimationGenerator:
         self.enhance = enhance
         self.enhancement_preset = enhancement_preset
         self.use_gimp = use_gimp
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.keep_frames = keep_frames
+        
+        # Decoded RGB frames by path, so the encoder doesn't decode each PNG again
+        self._frame_cache = {}
+        
+        # Raw frames superseded by their enhanced copies, deleted along with them
+        self._replaced_frames = []
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
         # Initialize enhancement if enabled
         if self.enhance and not ENHANCEMENT_AVAILABLE:
-            print("⚠ Warning: Enhancement modules not available. Frames will not be enhanced.")
+            logger.warning("⚠ Warning: Enhancement modules not available. Frames will not be enhanced.")
             self.enhance = False
         
     def generate_frame(self, prompt, frame_number, use_ai=True):
@@ -69,38 +104,64 @@ class AnimationGenerator:
         frame_filename = f"frame_{frame_number:04d}.png"
         frame_path = os.path.join(self.output_dir, frame_filename)
         
-        print(f"[Frame {frame_number}] Generating: {prompt[:60]}...")
+        logger.debug(f"[Frame {frame_number}] Generating: {prompt[:60]}...")
         
         try:
             if use_ai:
-                generate_image_with_ai(prompt, frame_path)
+                generate_image_with_ai(prompt, frame_path, fast=True, quiet=True)
             else:
-                generate_image(prompt, frame_path, use_gimp=False)
+                generate_image(prompt, frame_path, use_gimp=False, fast=True, quiet=True)
             
-            # Resize to target resolution if needed
+            # Resize to target resolution if needed, keeping the decoded frame
             self._resize_frame(frame_path)
             
-            print(f"    ✓ Saved: {frame_path}")
+            logger.debug(f"    ✓ Saved: {frame_path}")
             return frame_path
             
         except Exception as e:
-            print(f"    ✗ Error generating frame {frame_number}: {e}")
+            logger.error(f"    ✗ Error generating frame {frame_number}: {e}")
             return None
     
     def _resize_frame(self, frame_path):
-        """Resize frame to target resolution"""
+        """Resize frame to target resolution and cache its RGB pixels"""
         try:
             with Image.open(frame_path) as img:
                 if img.size != self.resolution:
-                    img_resized = img.resize(self.resolution, Image.Resampling.LANCZOS)
-                    img_resized.save(frame_path, 'PNG')
+                    # reducing_gap lets Pillow box-reduce large downscales
+                    # before the final filter pass
+                    img = img.resize(self.resolution, self._resample_filter(img.size),
+                                     reducing_gap=2.0)
+                    # Frames are only read back to build the animation, so
+                    # favour encode speed over file size
+                    img.save(frame_path, 'PNG', compress_level=1, optimize=False)
+                self._frame_cache[frame_path] = np.asarray(img.convert('RGB'))
         except Exception as e:
-            print(f"    ⚠ Warning: Could not resize frame: {e}")
+            logger.warning(f"    ⚠ Warning: Could not resize frame: {e}")
+    
+    def _resample_filter(self, size):
+        """LANCZOS only for big downscales; cheaper filters when sizes are close"""
+        ratio = max(size) / max(self.resolution)
+        if ratio > 2:
+            return Image.Resampling.LANCZOS
+        if ratio > 1.2:
+            return Image.Resampling.BICUBIC
+        return Image.Resampling.BILINEAR
+    
+    def _gen_one(self, args):
+        """Generate one (frame_number, prompt) pair; used as a pool task"""
+        frame_number, prompt, use_ai = args
+        frame_path = self.generate_frame(prompt, frame_number, use_ai=use_ai)
+        # Hand the decoded frame back too, since pool workers have their own cache
+        return frame_path, self._frame_cache.pop(frame_path, None)
     
     def generate_frames(self, prompts, use_ai=True):
         """
         Generate all animation frames
         
+        Frames are independent, so they are generated in parallel: threads for
+        AI generation (the time is spent waiting on the API) and processes for
+        local PIL rendering (CPU-bound).
+        
         Args:
             prompts (list): List of text descriptions for each frame
             use_ai (bool): Whether to use AI generation
@@ -108,23 +169,35 @@ class AnimationGenerator:
         Returns:
             list: Paths to successfully generated frames
         """
-        print(f"\n{'='*60}")
-        print(f"🎬 Generating {len(prompts)} animation frames")
-        print(f"📁 Output directory: {self.output_dir}")
-        print(f"📏 Resolution: {self.resolution[0]}x{self.resolution[1]}")
-        print(f"🎞️  Frame rate: {self.frame_rate} fps")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"🎬 Generating {len(prompts)} animation frames")
+        logger.info(f"📁 Output directory: {self.output_dir}")
+        logger.info(f"📏 Resolution: {self.resolution[0]}x{self.resolution[1]}")
+        logger.info(f"🎞️  Frame rate: {self.frame_rate} fps")
         if self.enhance:
-            print(f"✨ Enhancement: {self.enhancement_preset} preset")
-        print(f"{'='*60}\n")
+            logger.info(f"✨ Enhancement: {self.enhancement_preset} preset")
+        logger.info(f"{'='*60}\n")
         
         frame_paths = []
+        tasks = [(idx, prompt, use_ai) for idx, prompt in enumerate(prompts, start=1)]
+        workers = max(1, min(self.workers, len(tasks)))
+        executor_class = ThreadPoolExecutor if use_ai else ProcessPoolExecutor
+        
+        with executor_class(max_workers=workers) as executor:
+            results = executor.map(self._gen_one, tasks)
+            if tqdm is not None:
+                results = tqdm(results, total=len(tasks), desc="Frames", unit="frame")
+            results = list(results)
         
-        for idx, prompt in enumerate(prompts, start=1):
-            frame_path = self.generate_frame(prompt, idx, use_ai=use_ai)
+        # Enhanced copies replace the raw frames, so their pixels would never be read
+        keep_pixels = not (self.enhance and ENHANCEMENT_AVAILABLE)
+        for idx, (frame_path, pixels) in enumerate(results, start=1):
             if frame_path:
                 frame_paths.append(frame_path)
+                if pixels is not None and keep_pixels:
+                    self._frame_cache[frame_path] = pixels
             else:
-                print(f"\n⚠ Warning: Frame {idx} failed to generate")
+                logger.warning(f"\n⚠ Warning: Frame {idx} failed to generate")
         
         # Enhance frames if requested
         if self.enhance and frame_paths and ENHANCEMENT_AVAILABLE:
@@ -134,9 +207,9 @@ class AnimationGenerator:
     
     def _enhance_frames(self, frame_paths):
         """Enhance all generated frames"""
-        print(f"\n{'='*60}")
-        print(f"✨ Enhancing {len(frame_paths)} frames")
-        print(f"{'='*60}\n")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"✨ Enhancing {len(frame_paths)} frames")
+        logger.info(f"{'='*60}\n")
         
         preprocessor = FramePreprocessor(use_gimp=self.use_gimp)
         enhanced_dir = self.output_dir + '_enhanced'
@@ -147,12 +220,15 @@ class AnimationGenerator:
             preset=self.enhancement_preset
         )
         
-        if result['status'] == 'ok' and result['enhanced_frames']:
+        if result['status'] == 'ok':
             # Update output directory to use enhanced frames
             self.output_dir = enhanced_dir
-            return result['enhanced_frames']
+            self._replaced_frames.extend(frame_paths)
+            # The manifest is in completion order; frames go back in name order
+            return sorted(entry['out'] for entry in read_manifest(result['manifest_path'])
+                          if entry['ok'])
         else:
-            print(f"⚠ Enhancement failed or incomplete, using original frames")
+            logger.warning(f"⚠ Enhancement failed or incomplete, using original frames")
             return frame_paths
     
     def validate_frames(self, frame_paths):
@@ -165,28 +241,37 @@ class AnimationGenerator:
         Returns:
             bool: True if all frames are valid
         """
-        print(f"\n🔍 Validating {len(frame_paths)} frames...")
+        logger.info(f"\n🔍 Validating {len(frame_paths)} frames...")
         
         invalid_frames = []
         
         for frame_path in frame_paths:
             if not os.path.exists(frame_path):
                 invalid_frames.append(frame_path)
-                print(f"    ✗ Missing: {frame_path}")
+                logger.error(f"    ✗ Missing: {frame_path}")
+                continue
+            
+            # Frames decoded during generation already have a known size
+            pixels = self._frame_cache.get(frame_path)
+            if pixels is not None:
+                size = (pixels.shape[1], pixels.shape[0])
             else:
                 try:
                     with Image.open(frame_path) as img:
-                        if img.size != self.resolution:
-                            print(f"    ⚠ Size mismatch: {frame_path} ({img.size})")
+                        size = img.size
                 except Exception as e:
                     invalid_frames.append(frame_path)
-                    print(f"    ✗ Corrupt: {frame_path} - {e}")
+                    logger.error(f"    ✗ Corrupt: {frame_path} - {e}")
+                    continue
+            
+            if size != self.resolution:
+                logger.warning(f"    ⚠ Size mismatch: {frame_path} ({size})")
         
         if invalid_frames:
-            print(f"\n✗ Validation failed: {len(invalid_frames)} invalid frames")
+            logger.error(f"\n✗ Validation failed: {len(invalid_frames)} invalid frames")
             return False
         
-        print(f"✓ All {len(frame_paths)} frames validated successfully\n")
+        logger.info(f"✓ All {len(frame_paths)} frames validated successfully\n")
         return True
     
     def create_gif(self, frame_paths, output_filename="animation.gif", loop=0):
@@ -201,52 +286,160 @@ class AnimationGenerator:
         Returns:
             str: Path to generated GIF
         """
+        return self.create_animation(frame_paths, output_filename, loop=loop, fmt='gif')
+    
+    def create_animation(self, frame_paths, output_filename="animation.gif", loop=0, fmt='gif'):
+        """
+        Compile PNG sequence into an animated GIF, WebP or MP4
+        
+        GIF has to quantize every frame to a 256-color palette and stores each
+        one almost whole, which makes it the slowest and largest option.
+        Animated WebP (fastest encoder method) and H.264 MP4 both encode much
+        faster and produce far smaller files.
+        
+        Args:
+            frame_paths (list): List of frame file paths
+            output_filename (str): Name of output file
+            loop (int): Number of loops (0 = infinite, ignored for MP4)
+            fmt (str): Output format (gif|webp|mp4)
+            
+        Returns:
+            str: Path to generated animation
+        """
         if not frame_paths:
-            print("✗ No frames to compile")
+            logger.error("✗ No frames to compile")
+            return None
+        
+        if fmt not in ANIMATION_FORMATS:
+            logger.error(f"✗ Unsupported animation format: {fmt}")
             return None
         
         output_path = os.path.join(self.output_dir, output_filename)
+        label = fmt.upper()
         
-        print(f"🎬 Compiling {len(frame_paths)} frames into GIF...")
-        print(f"   Duration per frame: {self.frame_duration}ms")
-        print(f"   Loop count: {'infinite' if loop == 0 else loop}")
+        logger.info(f"🎬 Compiling {len(frame_paths)} frames into {label}...")
+        logger.info(f"   Duration per frame: {self.frame_duration}ms")
+        if fmt != 'mp4':
+            logger.info(f"   Loop count: {'infinite' if loop == 0 else loop}")
         
         try:
-            # Load all frames
-            frames = []
-            for frame_path in frame_paths:
-                img = Image.open(frame_path)
-                # Convert to RGB if necessary (GIF doesn't support transparency well)
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                frames.append(img)
+            if fmt == 'webp':
+                self._write_webp(frame_paths, output_path, loop)
+            elif fmt == 'mp4':
+                if not IMAGEIO_AVAILABLE:
+                    logger.error("✗ MP4 output requires imageio and imageio-ffmpeg")
+                    return None
+                self._write_mp4(frame_paths, output_path)
+            else:
+                self._write_gif(frame_paths, output_path, loop)
+            
+            file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
+            logger.info(f"✓ {label} created successfully: {output_path}")
+            logger.info(f"   File size: {file_size:.2f} MB")
+            logger.info(f"   Total frames: {len(frame_paths)}")
+            logger.info(f"   Animation duration: {len(frame_paths) * self.frame_duration / 1000:.2f}s")
+            
+            if not self.keep_frames:
+                self.discard_frames(frame_paths + self._replaced_frames)
+                self._replaced_frames = []
             
-            # Save as animated GIF
+            return output_path
+            
+        except Exception as e:
+            logger.error(f"✗ Error creating {label}: {e}")
+            return None
+
+
+    def _load_rgb_frame(self, frame_path):
+        """Open a frame as RGB (GIF doesn't support transparency well)"""
+        pixels = self._frame_cache.get(frame_path)
+        if pixels is not None:
+            return Image.fromarray(pixels)
+        img = Image.open(frame_path)
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        return img
+    
+    def _load_rgb_array(self, frame_path):
+        """Return a frame's RGB pixels, decoding the PNG only if not cached"""
+        pixels = self._frame_cache.get(frame_path)
+        if pixels is not None:
+            return pixels
+        with self._load_rgb_frame(frame_path) as img:
+            return np.asarray(img)
+    
+    def discard_frames(self, frame_paths):
+        """Delete frame PNGs and their cached pixels once they are no longer needed"""
+        for frame_path in frame_paths:
+            self._frame_cache.pop(frame_path, None)
+            try:
+                os.remove(frame_path)
+            except OSError:
+                pass
+    
+    def _gif_palette(self, frame_paths):
+        """Build one 256-color palette from a sample of evenly spaced frames"""
+        step = max(1, len(frame_paths) // GIF_PALETTE_SAMPLES)
+        # Only the colors matter, so the samples are pooled as one row of
+        # pixels; frames of different sizes can't be stacked as images
+        sample = np.concatenate([self._load_rgb_array(frame_path).reshape(-1, 3)
+                                 for frame_path in frame_paths[::step][:GIF_PALETTE_SAMPLES]])
+        return Image.fromarray(sample[np.newaxis]).quantize(colors=256,
+                                                            method=Image.Quantize.FASTOCTREE)
+    
+    def _write_gif(self, frame_paths, output_path, loop):
+        """
+        Save frames as an animated GIF sharing one global palette
+        
+        Letting the GIF encoder quantize every frame on its own dominates the
+        encode time. Frames of one animation share a look, so a palette built
+        once from a sample is mapped onto every frame instead, and the frames
+        are fed to Pillow one at a time as palette images.
+        """
+        palette = self._gif_palette(frame_paths)
+        
+        def quantized(paths):
+            for frame_path in paths:
+                with self._load_rgb_frame(frame_path) as img:
+                    yield img.quantize(palette=palette, dither=Image.Dither.FLOYDSTEINBERG)
+        
+        frames = quantized(frame_paths)
+        first = next(frames)
+        first.save(
+            output_path,
+            format='GIF',
+            append_images=frames,
+            save_all=True,
+            duration=self.frame_duration,
+            loop=loop,
+            optimize=False
+        )
+    
+    def _write_webp(self, frame_paths, output_path, loop):
+        """Save frames as animated WebP using libwebp's fastest method"""
+        frames = [self._load_rgb_frame(frame_path) for frame_path in frame_paths]
+        
+        try:
             frames[0].save(
                 output_path,
-                format='GIF',
+                format='WEBP',
                 append_images=frames[1:],
                 save_all=True,
                 duration=self.frame_duration,
                 loop=loop,
-                optimize=True
+                quality=85,
+                method=0
             )
-            
-            # Close all images
+        finally:
             for frame in frames:
                 frame.close()
-            
-            file_size = os.path.getsize(output_path) / (1024 * 1024)  # MB
-            print(f"✓ GIF created successfully: {output_path}")
-            print(f"   File size: {file_size:.2f} MB")
-            print(f"   Total frames: {len(frame_paths)}")
-            print(f"   Animation duration: {len(frame_paths) * self.frame_duration / 1000:.2f}s")
-            
-            return output_path
-            
-        except Exception as e:
-            print(f"✗ Error creating GIF: {e}")
-            return None
+    
+    def _write_mp4(self, frame_paths, output_path):
+        """Stream frames into an H.264 MP4 through imageio's ffmpeg plugin"""
+        with imageio.get_writer(output_path, format='FFMPEG', mode='I', fps=self.frame_rate,
+                                codec='libx264', quality=8) as writer:
+            for frame_path in frame_paths:
+                writer.append_data(self._load_rgb_array(frame_path))
 
 
 def main():
@@ -267,7 +460,13 @@ def main():
     parser.add_argument(
         "--output-name",
         default="animation.gif",
-        help="Name of output GIF file (default: animation.gif)"
+        help="Name of output file (default: animation.gif)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=ANIMATION_FORMATS,
+        default='gif',
+        help="Animation format; webp and mp4 encode much faster and smaller than gif (default: gif)"
     )
     parser.add_argument(
         "--frame-rate",
@@ -320,9 +519,23 @@ def main():
         action="store_true",
         help="Use GIMP for frame enhancement (slower but more advanced)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) // 2),
+        help="Number of frames to generate in parallel (default: half the CPU count)"
+    )
+    parser.add_argument(
+        "--discard-frames",
+        action="store_true",
+        help="Delete the individual frame PNGs once the animation is written"
+    )
     
     args = parser.parse_args()
     
+    # Show progress messages from the generator modules
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    
     # Create animation generator
     generator = AnimationGenerator(
         output_dir=args.output_dir,
@@ -330,7 +543,9 @@ def main():
         resolution=(args.width, args.height),
         enhance=args.enhance,
         enhancement_preset=args.enhancement_preset,
-        use_gimp=args.use_gimp_enhance
+        use_gimp=args.use_gimp_enhance,
+        workers=args.workers,
+        keep_frames=not args.discard_frames
     )
     
     # Interpolate prompts if requested
@@ -370,19 +585,26 @@ def main():
     
     # Validate frames
     if not generator.validate_frames(frame_paths):
-        print("\n⚠ Some frames failed validation. Proceeding with available frames...")
+        logger.warning("\n⚠ Some frames failed validation. Proceeding with available frames...")
+    
+    # Match the file extension to the chosen format
+    output_name = args.output_name
+    if os.path.splitext(output_name)[1].lower() != '.' + args.format:
+        output_name = os.path.splitext(output_name)[0] + '.' + args.format
     
-    # Create GIF
-    gif_path = generator.create_gif(frame_paths, args.output_name, loop=args.loop)
+    # Create animation
+    gif_path = generator.create_animation(frame_paths, output_name, loop=args.loop,
+                                          fmt=args.format)
     
     if gif_path:
-        print(f"\n{'='*60}")
-        print(f"🎉 Animation complete!")
-        print(f"📁 GIF saved to: {gif_path}")
-        print(f"🗂️  Frames saved to: {args.output_dir}/")
-        print(f"{'='*60}\n")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"🎉 Animation complete!")
+        logger.info(f"📁 {args.format.upper()} saved to: {gif_path}")
+        if generator.keep_frames:
+            logger.info(f"🗂️  Frames saved to: {args.output_dir}/")
+        logger.info(f"{'='*60}\n")
     else:
-        print("\n✗ Animation generation failed")
+        logger.error("\n✗ Animation generation failed")
         sys.exit(1)
 
 
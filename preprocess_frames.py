@@ -6,26 +6,317 @@ Batch enhance animation frames before GIF compilation to ensure consistent quali
 import os
 import sys
 import argparse
+import contextlib
+import fnmatch
+import hashlib
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import queue
+import re
+import struct
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
 from pathlib import Path
 import glob
-from enhance_image import ImageEnhancer
+import shutil
+from PIL import Image
+from enhance_image import (ImageEnhancer, PNG_ENCODERS, load_image, png_encoder_available,
+                           save_png)
+
+# Optional progress bar
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+logger = logging.getLogger(__name__)
+
+# Pool workers are spawned rather than forked so they don't inherit the
+# parent's threads; the log queue must come from the same context
+_mp_context = multiprocessing.get_context('spawn')
+
+# Queue feeding the CLI's log listener thread (see _start_log_listener)
+_log_queue = None
+
+# Per-process enhancer for pool workers, built once by _init_enhancer
+_worker_enhancer = None
+
+
+def _start_log_listener(stream=sys.stdout):
+    """
+    Route all logging through a queue drained by one listener thread
+    
+    Log calls only enqueue a record, and a single thread formats and writes
+    them, so lines from pool workers never interleave and callers never block
+    on the console.
+    
+    Returns:
+        logging.handlers.QueueListener: The started listener; stop() it on exit
+    """
+    global _log_queue
+    _log_queue = _mp_context.Queue(-1)
+    
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    root = logging.getLogger()
+    root.handlers[:] = [logging.handlers.QueueHandler(_log_queue)]
+    root.setLevel(logging.INFO)
+    
+    listener = logging.handlers.QueueListener(_log_queue, handler)
+    listener.start()
+    return listener
+
+
+def _init_enhancer(use_gimp, gimp_path, log_queue=None, log_level=logging.INFO):
+    """Pool initializer: construct the worker's ImageEnhancer once"""
+    global _worker_enhancer
+    if log_queue is not None:
+        # Send this worker's log records to the parent's listener
+        root = logging.getLogger()
+        root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+        root.setLevel(log_level)
+    _worker_enhancer = ImageEnhancer(use_gimp=use_gimp, gimp_path=gimp_path)
+
+
+def _enhance_chunk(chunk):
+    """
+    Enhance a group of frames inside a pool worker
+    
+    Working through several frames per task means one pickle round trip per
+    chunk rather than per frame, and only compact tuples are sent back.
+    
+    Args:
+        chunk (tuple): (preset, operations, encoder, [(frame_path, output_path), ...])
+        
+    Returns:
+        list: (frame_path, output_path, status, message) for each frame
+    """
+    preset, operations, encoder, frames = chunk
+    results = []
+    for frame_path, output_path in frames:
+        result = _worker_enhancer.enhance(frame_path, output_path, preset=preset,
+                                          operations=operations, fast=True, quiet=True,
+                                          encoder=encoder)
+        results.append((frame_path, output_path, result['status'], result['message']))
+    return results
+
+
+# Cache of enhanced frames inside the output directory (see _apply_cache)
+CACHE_DIRNAME = '.cache'
+
+# The cache keeps about this many runs' worth of entries (one per frame per
+# settings), evicting the least recently used beyond that
+CACHE_RUNS_KEPT = 4
+
+# Per-frame results written to the output directory (see read_manifest)
+MANIFEST_NAME = '_manifest.jsonl'
+
+
+def read_manifest(manifest_path):
+    """
+    Yield the per-frame entries of a preprocessing manifest
+    
+    Each entry is a dict with "in" and "out" paths, "ok" (bool) and "msg".
+    Entries are in completion order, not frame order.
+    """
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _file_digest(path):
+    """SHA-1 of a file's contents, streamed rather than read whole"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha1').hexdigest()
+        digest = hashlib.sha1()
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+        return digest.hexdigest()
+
+
+def _staging_path(path):
+    """
+    Hidden sibling of path to write into before renaming it into place
+    
+    The extension is kept, since GIMP picks its output format from it.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".tmp-{name}")
+
+
+def _copy_into_place(src, dst):
+    """
+    Copy src to dst as an independent file
+    
+    The copy is written beside dst and renamed over it, so an existing dst is
+    only replaced once the new file is complete. Copies rather than hard links
+    keep cache entries safe from anything that later rewrites an output in
+    place.
+    """
+    staging = _staging_path(dst)
+    shutil.copyfile(src, staging)
+    os.replace(staging, dst)
+
+
+def _prune_cache(cache_dir, keep):
+    """
+    Evict the least recently used cache entries beyond the newest keep
+    
+    Entries still hard-linked to an output (as older versions stored them)
+    are replaced with independent copies on the way.
+    """
+    with os.scandir(cache_dir) as entries:
+        files = [(entry.path, entry.stat()) for entry in entries
+                 if entry.is_file() and not entry.name.startswith('.')]
+    
+    files.sort(key=lambda item: item[1].st_mtime, reverse=True)
+    for path, info in files[keep:]:
+        os.remove(path)
+    for path, info in files[:keep]:
+        if info.st_nlink > 1:
+            _copy_into_place(path, path)
+
+
+def _chunked(items, size):
+    """Yield successive lists of up to size items"""
+    items = iter(items)
+    chunk = list(islice(items, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, size))
+
+
+def _available_cpus():
+    """CPUs this process may run on (honours taskset/cgroup affinity on Linux)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _compile_pattern(pattern):
+    """Compile a glob pattern into a case-sensitive regex matching whole names"""
+    return re.compile(fnmatch.translate(pattern))
+
+
+def _iter_frames(directory, pattern, pattern_re=None, ordered=True):
+    """
+    Yield (name, path) for the frame files in a directory matching a
+    pattern, in name order unless ordered is False
+    
+    A single os.scandir pass collects only the matching names, and full paths
+    are joined lazily as the caller consumes them. Like glob, hidden files
+    only match patterns that start with a dot. pattern_re is the pattern
+    already compiled with _compile_pattern, if the caller has it.
+    """
+    if os.sep in pattern or (os.altsep and os.altsep in pattern):
+        # Patterns reaching into subdirectories still need glob
+        paths = glob.glob(os.path.join(directory, pattern))
+        if ordered:
+            paths.sort()
+        for path in paths:
+            yield os.path.basename(path), path
+        return
+    
+    match = (pattern_re or _compile_pattern(pattern)).match
+    hidden = pattern.startswith('.')
+    with os.scandir(directory) as entries:
+        names = [entry.name for entry in entries
+                 if match(entry.name)
+                 and (hidden or not entry.name.startswith('.'))
+                 and entry.is_file()]
+    if ordered:
+        names.sort()
+    
+    prefix = os.path.join(directory, '')
+    for name in names:
+        yield name, prefix + name
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_size(frame_path):
+    """
+    Read (width, height) straight from a PNG's IHDR chunk
+    
+    Returns:
+        tuple: (width, height), or None if the file is not a PNG
+    """
+    with open(frame_path, 'rb') as f:
+        header = f.read(24)
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+
+def _probe_frame(frame_name, frame_path):
+    """
+    Read a frame's size from its header without decoding the pixels
+    
+    Returns:
+        tuple: (frame_name, (width, height) or None, error message or None)
+    """
+    try:
+        size = _png_size(frame_path)
+        if size is not None:
+            # Apply the same size limit Image.open() would have
+            if Image.MAX_IMAGE_PIXELS and size[0] * size[1] > 2 * Image.MAX_IMAGE_PIXELS:
+                raise Image.DecompressionBombError(
+                    f"Image size ({size[0] * size[1]} pixels) exceeds limit of "
+                    f"{2 * Image.MAX_IMAGE_PIXELS} pixels, could be decompression bomb DOS attack.")
+            return frame_name, size, None
+        
+        # Not a PNG (or a damaged one): let Pillow identify it
+        with Image.open(frame_path) as img:
+            return frame_name, img.size, None
+    except (OSError, Image.DecompressionBombError) as e:
+        return frame_name, None, str(e)
 
 
 class FramePreprocessor:
     """Batch enhance animation frames with progress tracking"""
     
-    def __init__(self, use_gimp=False, gimp_path=None):
+    def __init__(self, use_gimp=False, gimp_path=None, pattern='*.png', jobs=None):
         """
         Initialize frame preprocessor
         
         Args:
             use_gimp (bool): Whether to use GIMP for enhancement
             gimp_path (str): Path to GIMP executable
+            pattern (str): Glob pattern for frame files
+            jobs (int): Frames enhanced in parallel (default: available CPUs)
         """
         self.enhancer = ImageEnhancer(use_gimp=use_gimp, gimp_path=gimp_path)
+        self.workers = jobs or _available_cpus()
+        self.pattern = pattern
+        self._pattern_re = _compile_pattern(pattern)
+    
+    def _list_frames(self, directory, pattern=None, ordered=True):
+        """
+        List (name, path) for the frames in a directory
+        
+        Args:
+            directory (str): Directory to scan
+            pattern (str): Glob pattern, or None for the one given at init
+            ordered (bool): Sort by name; skip it when order doesn't matter
+            
+        Returns:
+            list: (name, path) tuples
+        """
+        if pattern is None or pattern == self.pattern:
+            return list(_iter_frames(directory, self.pattern, self._pattern_re, ordered))
+        return list(_iter_frames(directory, pattern, ordered=ordered))
     
     def preprocess_frames(self, frame_directory, output_directory=None, 
-                         preset='medium', operations=None, pattern='*.png'):
+                         preset='medium', operations=None, pattern=None, pipeline=False,
+                         cache=False, encoder='pil'):
         """
         Enhance all frames in a directory
         
@@ -34,85 +325,305 @@ class FramePreprocessor:
             output_directory (str): Directory to save enhanced frames (default: frame_directory + '_enhanced')
             preset (str): Enhancement preset
             operations (dict): Custom operations
-            pattern (str): Glob pattern for frame files
+            pattern (str): Glob pattern for frame files (default: the
+                preprocessor's pattern)
+            pipeline (bool): Overlap reading, enhancing and writing frames in
+                separate threads (Pillow-only enhancement)
+            cache (bool): Reuse earlier results for frames whose content and
+                settings are unchanged (kept in output_directory/.cache)
+            encoder (str): PNG encoder for the enhanced frames (pil|cv2|vips);
+                GIMP writes its own output
             
         Returns:
-            dict: Result with status, enhanced frames list, and statistics
+            dict: Result with status, statistics and manifest_path, a JSON lines
+                file with one entry per frame (see read_manifest)
         """
+        error = self._check_directory(frame_directory)
+        if error:
+            return error
+        
         try:
-            if not os.path.exists(frame_directory):
-                return self._error("directory_not_found", f"Directory not found: {frame_directory}")
-            
             # Determine output directory
             if output_directory is None:
                 output_directory = frame_directory + '_enhanced'
             
             os.makedirs(output_directory, exist_ok=True)
             
+            if cache and os.path.samefile(frame_directory, output_directory):
+                # Outputs would replace the very frames the cache is keyed on
+                logger.warning("⚠ Caching needs an output directory separate from the input "
+                               "frames; continuing without the cache")
+                cache = False
+            
             # Find all frame files
-            frame_pattern = os.path.join(frame_directory, pattern)
-            frame_files = sorted(glob.glob(frame_pattern))
+            # Frames finish out of order anyway, so only the result is sorted
+            frame_files = self._list_frames(frame_directory, pattern, ordered=False)
             
             if not frame_files:
-                return self._error("no_frames", f"No frames found matching pattern: {pattern}")
+                return self._error("no_frames",
+                                   f"No frames found matching pattern: {pattern or self.pattern}")
             
-            print(f"\n{'='*60}")
-            print(f"🎬 Preprocessing {len(frame_files)} animation frames")
-            print(f"📁 Input: {frame_directory}")
-            print(f"📁 Output: {output_directory}")
-            print(f"📋 Preset: {preset}")
-            print(f"{'='*60}\n")
+            logger.info(f"\n{'='*60}")
+            logger.info(f"🎬 Preprocessing {len(frame_files)} animation frames")
+            logger.info(f"📁 Input: {frame_directory}")
+            logger.info(f"📁 Output: {output_directory}")
+            logger.info(f"📋 Preset: {preset}")
+            logger.info(f"⚙️  Jobs: {self.workers}")
+            logger.info(f"{'='*60}\n")
             
-            # Process each frame
-            enhanced_frames = []
-            failed_frames = []
+            if not png_encoder_available(encoder):
+                logger.warning(f"⚠ PNG encoder '{encoder}' is not available, using Pillow")
+                encoder = 'pil'
             
-            for idx, frame_path in enumerate(frame_files, 1):
-                frame_name = os.path.basename(frame_path)
-                output_path = os.path.join(output_directory, frame_name)
-                
-                print(f"[{idx}/{len(frame_files)}] Enhancing: {frame_name}")
-                
-                result = self.enhancer.enhance(
-                    frame_path,
-                    output_path,
-                    preset=preset,
-                    operations=operations
-                )
-                
-                if result['status'] == 'ok':
-                    enhanced_frames.append(output_path)
-                    print(f"  ✓ Enhanced: {frame_name}\n")
-                else:
-                    failed_frames.append({
-                        'frame': frame_name,
-                        'error': result['message']
-                    })
-                    print(f"  ✗ Failed: {result['message']}\n")
+            # Process frames in parallel
+            success_count = failure_count = 0
+            # Every path is worked out once up front, so neither the result
+            # loop nor the workers have to split or join paths per frame
+            output_prefix = os.path.join(output_directory, '')
+            tasks = [(frame_path, output_prefix + frame_name)
+                     for frame_name, frame_path in frame_files]
+            frame_names = {frame_path: frame_name for frame_name, frame_path in frame_files}
+            total = len(tasks)
+            
+            reused, staged = [], {}
+            if cache:
+                tasks, reused, staged = self._apply_cache(tasks, output_directory,
+                                                               preset, operations)
+                if reused:
+                    logger.info(f"♻️  Reusing {len(reused)} cached frames\n")
+            
+            if pipeline and not self.enhancer.use_gimp:
+                results = self._pipeline(tasks, preset, operations, encoder)
+            else:
+                results = self._run_tasks(tasks, preset, operations, encoder)
+            results = chain(reused, results)
+            
+            # A progress bar redraws one line instead of scrolling per frame
+            log_frame = logger.info
+            if tqdm is not None:
+                results = tqdm(results, total=total, desc="Enhancing", unit="frame")
+                log_frame = logger.debug
+            
+            # Results stream into the manifest as they arrive instead of
+            # piling up in lists, so memory stays flat however many frames
+            manifest_path = os.path.join(output_directory, MANIFEST_NAME)
+            with open(manifest_path, 'w', encoding='utf-8') as manifest:
+                for done, (frame_path, output_path, status, message) in enumerate(results, 1):
+                    frame_name = frame_names[frame_path]
+                    ok = status == 'ok'
+                    
+                    if output_path in staged:
+                        # Swap the fresh result in for the old output and keep
+                        # a copy for the next run (see _apply_cache)
+                        staging_path = output_path
+                        output_path, cache_path = staged.pop(staging_path)
+                        if ok:
+                            os.replace(staging_path, output_path)
+                            if not os.path.exists(cache_path):
+                                _copy_into_place(output_path, cache_path)
+                        elif os.path.lexists(staging_path):
+                            os.remove(staging_path)
+                    
+                    manifest.write(json.dumps({'in': frame_path, 'out': output_path,
+                                               'ok': ok, 'msg': message}) + '\n')
+                    
+                    if ok:
+                        success_count += 1
+                        log_frame(f"[{done}/{total}] ✓ Enhanced: {frame_name}")
+                    else:
+                        failure_count += 1
+                        log_frame(f"[{done}/{total}] ✗ Failed: {frame_name}: {message}")
+            
+            if cache:
+                _prune_cache(os.path.join(output_directory, CACHE_DIRNAME),
+                             CACHE_RUNS_KEPT * total)
             
             # Summary
-            print(f"{'='*60}")
-            print(f"✓ Preprocessing complete")
-            print(f"  Enhanced: {len(enhanced_frames)}/{len(frame_files)} frames")
-            if failed_frames:
-                print(f"  Failed: {len(failed_frames)} frames")
-            print(f"{'='*60}\n")
+            logger.info(f"\n{'='*60}")
+            logger.info(f"✓ Preprocessing complete")
+            logger.info(f"  Enhanced: {success_count}/{len(frame_files)} frames")
+            if failure_count:
+                logger.info(f"  Failed: {failure_count} frames")
+            logger.info(f"{'='*60}\n")
             
             return {
-                'status': 'ok' if enhanced_frames else 'error',
-                'code': 'success' if enhanced_frames else 'all_failed',
-                'message': f'Enhanced {len(enhanced_frames)} frames',
-                'enhanced_frames': enhanced_frames,
-                'failed_frames': failed_frames,
+                'status': 'ok' if success_count else 'error',
+                'code': 'success' if success_count else 'all_failed',
+                'message': f'Enhanced {success_count} frames',
+                'manifest_path': manifest_path,
                 'output_directory': output_directory,
                 'total_frames': len(frame_files),
-                'success_count': len(enhanced_frames),
-                'failure_count': len(failed_frames)
+                'success_count': success_count,
+                'failure_count': failure_count
             }
             
-        except Exception as e:
+        except OSError as e:
             return self._error("preprocessing_failed", str(e))
     
+    def _apply_cache(self, tasks, output_directory, preset, operations):
+        """
+        Split tasks into frames with a cached result and frames to enhance
+        
+        Cache entries are named by a hash of the frame's bytes plus the
+        enhancement settings, so an entry only matches an unchanged frame
+        enhanced the same way. Hits are copied into place and marked as
+        recently used for _prune_cache.
+        
+        Misses are enhanced into a staging file rather than the output path,
+        so the previous output survives until the new one has been written.
+        
+        Returns:
+            tuple: (remaining tasks, result tuples for reused frames,
+                    {staging path: (output_path, cache entry path)})
+        """
+        cache_dir = os.path.join(output_directory, CACHE_DIRNAME)
+        os.makedirs(cache_dir, exist_ok=True)
+        settings = repr((preset, sorted((operations or {}).items()), self.enhancer.use_gimp))
+        
+        # Hashing is I/O plus OpenSSL code that releases the GIL
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            digests = list(executor.map(_file_digest, (frame_path for frame_path, _ in tasks)))
+        
+        remaining, reused, staged = [], [], {}
+        for (frame_path, output_path), digest in zip(tasks, digests):
+            key = hashlib.sha1(f"{digest}:{settings}".encode()).hexdigest()
+            cache_path = os.path.join(cache_dir, key + '.png')
+            
+            if os.path.exists(cache_path):
+                _copy_into_place(cache_path, output_path)
+                os.utime(cache_path)
+                reused.append((frame_path, output_path, 'ok', 'Reused cached enhancement'))
+                continue
+            
+            staging_path = _staging_path(output_path)
+            remaining.append((frame_path, staging_path))
+            staged[staging_path] = (output_path, cache_path)
+        
+        return remaining, reused, staged
+    
+    def _run_tasks(self, tasks, preset, operations, encoder='pil'):
+        """
+        Enhance frames concurrently, yielding
+        (frame_path, output_path, status, message) as frames finish
+        
+        Pillow enhancement is CPU-bound, so it runs in a process pool with one
+        enhancer per worker, fed chunks of frames to amortize the IPC. Chunks
+        are streamed back in completion order, so a slow chunk never holds up
+        the ones already finished behind it. GIMP does its work in its own
+        processes, so threads are enough there; each thread borrows an
+        enhancer with its own persistent GIMP batch process.
+        """
+        workers = max(1, min(self.workers, len(tasks)))
+        
+        def run(enhancer, frame_path, output_path):
+            result = enhancer.enhance(frame_path, output_path, preset=preset,
+                                      operations=operations, fast=True, quiet=True,
+                                      encoder=encoder)
+            return frame_path, output_path, result['status'], result['message']
+        
+        if workers == 1:
+            with self.enhancer.open_batch():
+                for frame_path, output_path in tasks:
+                    yield run(self.enhancer, frame_path, output_path)
+            return
+        
+        if not self.enhancer.use_gimp:
+            # A few chunks per worker keeps the load balanced near the end
+            chunk_size = max(1, len(tasks) // (workers * 4))
+            chunks = ((preset, operations, encoder, frames) for frames in _chunked(tasks, chunk_size))
+            initargs = (False, None, _log_queue, logging.getLogger().getEffectiveLevel())
+            with _mp_context.Pool(workers, initializer=_init_enhancer, initargs=initargs) as pool:
+                for results in pool.imap_unordered(_enhance_chunk, chunks):
+                    yield from results
+            return
+        
+        with contextlib.ExitStack() as stack:
+            idle = queue.Queue()
+            for _ in range(workers):
+                enhancer = ImageEnhancer(use_gimp=True, gimp_path=self.enhancer.gimp_path)
+                idle.put(stack.enter_context(enhancer.open_batch()))
+            
+            def borrow_and_run(task):
+                enhancer = idle.get()
+                try:
+                    return run(enhancer, *task)
+                finally:
+                    idle.put(enhancer)
+            
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(borrow_and_run, task) for task in tasks]
+                for future in as_completed(futures):
+                    yield future.result()
+    
+    def _pipeline(self, tasks, preset, operations, encoder='pil'):
+        """
+        Enhance frames as a read -> enhance -> write pipeline, yielding
+        (frame_path, output_path, status, message) as each frame is written
+        
+        A reader thread decodes frames, worker threads enhance them and a
+        writer thread encodes the results, so disk I/O for neighbouring frames
+        overlaps with enhancement. The queues are bounded, which caps the
+        number of decoded frames in memory at a few per worker.
+        """
+        workers = max(1, min(self.workers, len(tasks)))
+        read_q = queue.Queue(maxsize=2 * workers)
+        write_q = queue.Queue(maxsize=2 * workers)
+        done_q = queue.Queue()
+        enhancer = self.enhancer
+        
+        def reader():
+            for frame_path, output_path in tasks:
+                try:
+                    img = load_image(frame_path)
+                except Exception as e:
+                    done_q.put((frame_path, output_path, 'error', str(e)))
+                    continue
+                read_q.put((frame_path, output_path, img))
+            for _ in range(workers):
+                read_q.put(None)
+        
+        def worker():
+            while True:
+                item = read_q.get()
+                if item is None:
+                    write_q.put(None)
+                    return
+                frame_path, output_path, img = item
+                try:
+                    img = enhancer.enhance_image(img, preset=preset, operations=operations)
+                except Exception as e:
+                    done_q.put((frame_path, output_path, 'error', str(e)))
+                    continue
+                write_q.put((frame_path, output_path, img))
+        
+        def writer():
+            remaining = workers
+            while remaining:
+                item = write_q.get()
+                if item is None:
+                    remaining -= 1
+                    continue
+                frame_path, output_path, img = item
+                try:
+                    save_png(img, output_path, encoder, fast=True)
+                except Exception as e:
+                    done_q.put((frame_path, output_path, 'error', str(e)))
+                    continue
+                done_q.put((frame_path, output_path, 'ok', 'Enhancement completed successfully'))
+        
+        threads = [threading.Thread(target=reader, daemon=True),
+                   threading.Thread(target=writer, daemon=True)]
+        threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        
+        for _ in range(len(tasks)):
+            yield done_q.get()
+        
+        for thread in threads:
+            thread.join()
+    
     def validate_frames(self, frame_directory, expected_resolution=None):
         """
         Validate that all frames exist and have consistent properties
@@ -124,56 +635,64 @@ class FramePreprocessor:
         Returns:
             dict: Validation result with status and issues list
         """
-        from PIL import Image
+        error = self._check_directory(frame_directory)
+        if error:
+            return error
         
         try:
-            frame_files = sorted(glob.glob(os.path.join(frame_directory, '*.png')))
+            # Resolutions are tallied per bucket, so scan order doesn't matter
+            frame_files = self._list_frames(frame_directory, ordered=False)
             
             if not frame_files:
-                return self._error("no_frames", "No PNG frames found")
+                return self._error("no_frames", f"No frames found matching pattern: {self.pattern}")
             
             issues = []
-            resolutions = {}
+            resolutions = defaultdict(list)
             
-            for frame_path in frame_files:
-                frame_name = os.path.basename(frame_path)
-                
-                try:
-                    with Image.open(frame_path) as img:
-                        resolution = img.size
-                        
-                        # Track resolution distribution
-                        if resolution not in resolutions:
-                            resolutions[resolution] = []
-                        resolutions[resolution].append(frame_name)
-                        
-                        # Check against expected resolution
-                        if expected_resolution and resolution != expected_resolution:
-                            issues.append({
-                                'frame': frame_name,
-                                'issue': 'wrong_resolution',
-                                'expected': expected_resolution,
-                                'actual': resolution
-                            })
-                        
-                except Exception as e:
+            # Reading headers is mostly file-open latency, which threads overlap
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                probes = list(executor.map(_probe_frame, *zip(*frame_files)))
+            
+            for frame_name, resolution, error in probes:
+                if error is not None:
                     issues.append({
                         'frame': frame_name,
                         'issue': 'corrupt_or_unreadable',
-                        'error': str(e)
+                        'error': error
+                    })
+                    continue
+                
+                # Track resolution distribution
+                resolutions[resolution].append(frame_name)
+                
+                # Check against expected resolution
+                if expected_resolution and resolution != expected_resolution:
+                    issues.append({
+                        'frame': frame_name,
+                        'issue': 'wrong_resolution',
+                        'expected': expected_resolution,
+                        'actual': resolution
                     })
             
-            # Check for multiple resolutions
+            # Check for multiple resolutions. Frames off the most common size
+            # are flagged; if that size is tied there is no reference size
+            # (and scan order must not pick one), so none are
             if len(resolutions) > 1:
+                counts = Counter({k: len(v) for k, v in resolutions.items()})
+                (common_resolution, top), (_, runner_up) = counts.most_common(2)
                 for resolution, frames in resolutions.items():
-                    if len(frames) < len(frame_files) / 2:  # Minority resolution
-                        for frame in frames:
-                            issues.append({
-                                'frame': frame,
-                                'issue': 'inconsistent_resolution',
-                                'resolution': resolution,
-                                'common_resolution': max(resolutions.keys(), key=lambda k: len(resolutions[k]))
-                            })
+                    # Frames off the expected size were already reported above
+                    if top == runner_up or resolution == common_resolution or (
+                            expected_resolution and resolution != expected_resolution):
+                        continue
+                    for frame in frames:
+                        issues.append({
+                            'frame': frame,
+                            'issue': 'inconsistent_resolution',
+                            'resolution': resolution,
+                            'common_resolution': common_resolution
+                        })
             
             return {
                 'status': 'ok' if not issues else 'warning',
@@ -184,9 +703,17 @@ class FramePreprocessor:
                 'issues': issues
             }
             
-        except Exception as e:
+        except OSError as e:
             return self._error("validation_failed", str(e))
     
+    def _check_directory(self, frame_directory):
+        """Return an error result if frame_directory can't be listed, else None"""
+        if not os.path.isdir(frame_directory):
+            return self._error("directory_not_found", f"Directory not found: {frame_directory}")
+        if not os.access(frame_directory, os.R_OK | os.X_OK):
+            return self._error("directory_not_readable", f"Directory not readable: {frame_directory}")
+        return None
+    
     def _error(self, code, message):
         """Return error result"""
         return {
@@ -214,6 +741,12 @@ def main():
         default='medium',
         help="Enhancement preset (default: medium)"
     )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help="Frames to enhance in parallel (default: available CPUs)"
+    )
     parser.add_argument(
         '--pattern',
         default='*.png',
@@ -228,6 +761,22 @@ def main():
         '--gimp-path',
         help="Path to GIMP executable"
     )
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help="Overlap frame reads, enhancement and writes (Pillow-only enhancement)"
+    )
+    parser.add_argument(
+        '--encoder',
+        choices=PNG_ENCODERS,
+        default='pil',
+        help="PNG encoder for enhanced frames (default: pil)"
+    )
+    parser.add_argument(
+        '--cache',
+        action='store_true',
+        help="Skip frames already enhanced with the same settings in an earlier run"
+    )
     parser.add_argument(
         '--validate-only',
         action='store_true',
@@ -239,11 +788,24 @@ def main():
     )
     
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     
+    listener = _start_log_listener()
+    try:
+        _run_cli(args)
+    finally:
+        listener.stop()
+
+
+def _run_cli(args):
+    """Run the preprocessing CLI for parsed arguments"""
     # Create preprocessor
     preprocessor = FramePreprocessor(
         use_gimp=args.use_gimp,
-        gimp_path=args.gimp_path
+        gimp_path=args.gimp_path,
+        pattern=args.pattern,
+        jobs=args.jobs
     )
     
     # Parse expected resolution
@@ -253,7 +815,7 @@ def main():
             w, h = args.expected_resolution.split('x')
             expected_resolution = (int(w), int(h))
         except:
-            print(f"✗ Invalid resolution format: {args.expected_resolution}")
+            logger.error(f"✗ Invalid resolution format: {args.expected_resolution}")
             sys.exit(1)
     
     # Validate or preprocess
@@ -263,38 +825,42 @@ def main():
             expected_resolution=expected_resolution
         )
         
-        print(f"\n{'='*60}")
-        print(f"🔍 Frame Validation Results")
-        print(f"{'='*60}")
-        print(f"Status: {result['status']}")
-        print(f"Total frames: {result.get('total_frames', 0)}")
-        print(f"Resolutions: {result.get('resolutions', {})}")
+        logger.info(f"\n{'='*60}")
+        logger.info(f"🔍 Frame Validation Results")
+        logger.info(f"{'='*60}")
+        logger.info(f"Status: {result['status']}")
+        logger.info(f"Total frames: {result.get('total_frames', 0)}")
+        logger.info(f"Resolutions: {result.get('resolutions', {})}")
         
         if result.get('issues'):
-            print(f"\n⚠ Issues found: {len(result['issues'])}")
+            logger.info(f"\n⚠ Issues found: {len(result['issues'])}")
             for issue in result['issues'][:10]:  # Show first 10
-                print(f"  • {issue['frame']}: {issue['issue']}")
+                logger.info(f"  • {issue['frame']}: {issue['issue']}")
         else:
-            print("\n✓ All frames validated successfully")
+            logger.info("\n✓ All frames validated successfully")
         
-        print(f"{'='*60}\n")
+        logger.info(f"{'='*60}\n")
         
     else:
         result = preprocessor.preprocess_frames(
             args.input_directory,
             output_directory=args.output_directory,
             preset=args.preset,
-            pattern=args.pattern
+            pipeline=args.pipeline,
+            cache=args.cache,
+            encoder=args.encoder
         )
         
         if result['status'] == 'error':
-            print(f"\n✗ Error: {result['message']}")
+            logger.error(f"\n✗ Error: {result['message']}")
             sys.exit(1)
         
-        if result.get('failed_frames'):
-            print(f"\n⚠ Some frames failed:")
-            for failed in result['failed_frames'][:10]:
-                print(f"  • {failed['frame']}: {failed['error']}")
+        if result.get('failure_count'):
+            logger.warning(f"\n⚠ Some frames failed:")
+            failures = (entry for entry in read_manifest(result['manifest_path'])
+                        if not entry['ok'])
+            for failed in islice(failures, 10):
+                logger.warning(f"  • {os.path.basename(failed['in'])}: {failed['msg']}")
     
     sys.exit(0 if result['status'] in ('ok', 'warning') else 1)
 